@@ -0,0 +1,143 @@
+"""
+AIMD concurrency control for detail scraping
+
+An AIMDConcurrency is used like an asyncio.Semaphore (``async with limiter:``)
+but its limit moves: after every window of completions (one "round trip" of
+the current limit) it grows by ``increase`` if the window's latency and error
+rate were under target, and it is cut by ``decrease`` as soon as a request
+times out or runs into a block page. Only requests started after the last cut
+can cut again, so a burst of failures from one overloaded round counts once.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AIMDConcurrency:
+    """Additive-increase / multiplicative-decrease concurrency limit"""
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 20, target_latency: float = 15.0,
+                 max_error_rate: float = 0.1, increase: int = 1, decrease: float = 0.5, name: str = "detail"):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.target_latency = target_latency  # Mean seconds per slot in a window that still allows growth
+        self.max_error_rate = max_error_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.name = name
+
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        # Start time and failure reason of each task holding a slot
+        self._slots: Dict[asyncio.Task, Tuple[float, Optional[str]]] = {}
+        self._last_decrease = float('-inf')
+
+        # Current window
+        self._latencies: List[float] = []
+        self._errors = 0
+
+        # Exported state: (seconds since start, limit) at every change
+        self._started = time.monotonic()
+        self.history: List[Tuple[float, int]] = [(0.0, self.limit)]
+        self.completed = 0
+        self.failed = 0
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+        self._slots[asyncio.current_task()] = (time.monotonic(), None)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        started, failure = self._slots.pop(asyncio.current_task(), (time.monotonic(), None))
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            failure = failure or exc_type.__name__
+        self._complete(time.monotonic() - started, failure)
+
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def mark_failed(self, reason: str):
+        """Count the current slot as an error without cutting the limit (e.g. a page with no data)"""
+        task = asyncio.current_task()
+        if task in self._slots:
+            self._slots[task] = (self._slots[task][0], reason)
+
+    def overload(self, reason: str):
+        """Timeout or block detected: mark the current slot failed and cut the limit"""
+        self.mark_failed(reason)
+        started = self._slots.get(asyncio.current_task(), (time.monotonic(), None))[0]
+        # Requests launched before the last cut were sized for the old limit
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self._set_limit(int(self.limit * self.decrease), reason)
+
+    def _complete(self, latency: float, failure: Optional[str]):
+        self.completed += 1
+        self._latencies.append(latency)
+        if failure:
+            self.failed += 1
+            self._errors += 1
+
+        if len(self._latencies) < self.limit:
+            return
+
+        # One window of completions: grow if latency and errors stayed under target
+        mean_latency = sum(self._latencies) / len(self._latencies)
+        error_rate = self._errors / len(self._latencies)
+        if error_rate <= self.max_error_rate and mean_latency <= self.target_latency:
+            self._set_limit(self.limit + self.increase,
+                            f"mean latency {mean_latency:.1f} s, {error_rate:.0%} errors")
+        else:
+            self._reset_window()
+
+    def _set_limit(self, limit: int, reason: str):
+        limit = min(max(limit, self.min_limit), self.max_limit)
+        if limit != self.limit:
+            logger.info(f"[{self.name}] Concurrency {self.limit} -> {limit} ({reason})")
+            self.limit = limit
+            self.history.append((time.monotonic() - self._started, limit))
+            # Let waiting tasks in when the limit grows
+            asyncio.get_running_loop().create_task(self._wake())
+        self._reset_window()
+
+    def _reset_window(self):
+        self._latencies = []
+        self._errors = 0
+
+    async def _wake(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        elapsed = time.monotonic() - self._started
+        # Time-weighted mean of the limit over the run
+        weighted = 0.0
+        for (at, limit), (until, _) in zip(self.history, self.history[1:] + [(elapsed, None)]):
+            weighted += limit * (until - at)
+        return {
+            "limit": self.limit,
+            "min": min(limit for _, limit in self.history),
+            "max": max(limit for _, limit in self.history),
+            "mean": weighted / elapsed if elapsed > 0 else float(self.limit),
+            "changes": len(self.history) - 1,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        """Log where the limit ended up and how it moved"""
+        s = self.stats()
+        (log or logger).info(
+            f"[{self.name}] Adaptive concurrency: final {s['limit']}, range {s['min']}-{s['max']}, "
+            f"time-weighted mean {s['mean']:.1f}, {s['changes']} changes over {s['completed']} requests "
+            f"({s['failed']} failed)"
+        )
@@ -0,0 +1,75 @@
+"""
+Benchmark: frontier lookup cost as the number of known listings grows
+
+Fills a fresh URLFrontier with N LoopNet listing URLs (through plan(), in
+search-page sized batches), reopens it the way the next run would, then
+times plan() on a batch of unseen URLs (answered by the Bloom filter alone)
+and on a batch of known URLs (Bloom filter plus the sqlite primary key).
+Reports microseconds per URL, the filter size and the observed false
+positive rate.
+
+Usage: python -m benchmarks.frontier_lookup [--sizes 10000 100000 1000000] [--probe 20000]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from frontier import URLFrontier
+
+BATCH = 500
+
+
+def listing(n: int) -> dict:
+    return {"url": f"https://www.loopnet.com/Listing/{n}-Main-St-New-York-NY/{30_000_000 + n}/?sk=abc"}
+
+
+def run(size: int, probe: int, root: Path):
+    frontier = URLFrontier(root)
+    frontier.open()
+    started = time.perf_counter()
+    for start in range(0, size, BATCH):
+        frontier.plan([listing(n) for n in range(start, min(start + BATCH, size))])
+    fill_seconds = time.perf_counter() - started
+    frontier.close()
+
+    # Next run: fresh process state, filter loaded from disk
+    frontier = URLFrontier(root)
+    frontier.open()
+    unseen = [listing(n) for n in range(size, size + probe)]
+    started = time.perf_counter()
+    frontier.plan(unseen)
+    unseen_us = (time.perf_counter() - started) / probe * 1e6
+    false_positives = frontier.false_positives
+
+    known = [listing(n) for n in range(0, size, max(1, size // probe))][:probe]
+    started = time.perf_counter()
+    frontier.plan(known)
+    known_us = (time.perf_counter() - started) / len(known) * 1e6
+
+    bloom_mb = len(frontier.bloom.bits) / 1024 / 1024
+    frontier.close()
+    db_mb = sum(p.stat().st_size for p in root.glob('seen.sqlite*')) / 1024 / 1024
+    return fill_seconds, unseen_us, false_positives / probe, known_us, bloom_mb, db_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--probe', type=int, default=20_000, help='URLs per timed plan() batch')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'known':>10}{'fill (s)':>10}{'new (us/url)':>14}{'false pos':>11}"
+          f"{'known (us/url)':>16}{'bloom (MB)':>12}{'sqlite (MB)':>13}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            fill, unseen_us, fp_rate, known_us, bloom_mb, db_mb = run(size, args.probe, Path(tmp))
+        print(f"{size:>10}{fill:>10.1f}{unseen_us:>14.1f}{fp_rate:>11.2%}{known_us:>16.1f}"
+              f"{bloom_mb:>12.1f}{db_mb:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: LoopNet output with raw JSON-LD inline vs in the content-addressed side store
+
+Builds records through PlaywrightLoopNetScraper._extract_property_data from
+synthetic listing JSON-LD (sized like a real listing, with some listings
+repeated as happens across overlapping searches), then calls save_results.
+Reports output file sizes, the tracemalloc peak while holding self.results,
+and the CSV write time, with store_json_ld off and on.
+
+Usage: python -m benchmarks.loopnet_json_ld_store [--listings 5000]
+"""
+
+import argparse
+import csv
+import json
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from blob_store import BlobStore
+from loopnetnew import PlaywrightLoopNetScraper
+
+
+def listing_json_ld(i: int) -> str:
+    rng = random.Random(i)
+    return json.dumps({
+        "@context": "https://schema.org",
+        "@type": "RealEstateListing",
+        "name": f"Listing {i}",
+        "description": " ".join(rng.choice(["retail", "office", "multifamily", "corner", "lot", "zoned",
+                                             "renovated", "tenant", "lease", "cap", "rate"])
+                                 for _ in range(rng.randint(150, 400))),
+        "image": [f"https://images1.loopnet.com/i2/{i}/{n}.jpg" for n in range(rng.randint(5, 30))],
+        "offers": [{"price": rng.randint(500_000, 20_000_000), "priceCurrency": "USD"}],
+        "additionalProperty": [
+            {"name": "Property Type", "value": ["Multifamily"]},
+            {"name": "Building Size", "value": [f"{rng.randint(2_000, 90_000):,} SF"]},
+            {"name": "Lot Size", "value": [f"{rng.uniform(0.1, 4):.2f} AC"]},
+            {"name": "Year Built", "value": [str(rng.randint(1900, 2020))]},
+        ],
+        "contentLocation": {"address": {"streetAddress": f"{i} Main St", "addressLocality": "New York",
+                                        "addressRegion": "NY", "postalCode": "10001", "addressCountry": "US"}},
+        "provider": [{"name": "Broker", "@id": f"https://www.loopnet.com/profile/{i}"}],
+    })
+
+
+def run(listings: int, store: bool, workdir: Path):
+    scraper = PlaywrightLoopNetScraper()
+    scraper.output_dir = workdir
+    scraper.store_json_ld = store
+    scraper.json_ld_store = BlobStore(workdir / "json_ld")
+
+    tracemalloc.start()
+    for i in range(listings):
+        # Roughly one listing in ten shows up twice
+        listing = i if i % 10 else max(i - 1, 0)
+        url = f"https://www.loopnet.com/Listing/{listing}-Main-St-New-York-NY/{listing}/"
+        scraper.results.append(scraper._extract_property_data({"jsonLd": listing_json_ld(listing)}, url))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Time the CSV write on its own, the way save_results does it
+    fieldnames = sorted({key for item in scraper.results for key in item})
+    start = time.perf_counter()
+    with open(workdir / "csv_timing.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(scraper.results)
+    csv_seconds = time.perf_counter() - start
+
+    scraper.save_results()
+    json_size = sum(p.stat().st_size for p in workdir.glob('loopnet_listings_*.json'))
+    csv_size = sum(p.stat().st_size for p in workdir.glob('loopnet_listings_*.csv'))
+    store_size = sum(p.stat().st_size for p in (workdir / "json_ld").rglob('*.json.gz'))
+    return json_size, csv_size, store_size, peak, csv_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--listings', type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    mb = 1024 * 1024
+    print(f"{args.listings} listings")
+    print(f"{'json_ld_data':<14}{'JSON (MB)':>11}{'CSV (MB)':>10}{'store (MB)':>12}"
+          f"{'results peak (MB)':>19}{'CSV write (s)':>15}")
+    for label, store in (("inline", False), ("side store", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_size, csv_size, store_size, peak, csv_seconds = run(args.listings, store, Path(tmp))
+        print(f"{label:<14}{json_size / mb:>11.1f}{csv_size / mb:>10.1f}{store_size / mb:>12.1f}"
+              f"{peak / mb:>19.1f}{csv_seconds:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
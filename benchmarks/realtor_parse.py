@@ -0,0 +1,79 @@
+"""
+Micro-benchmark: realtor.com page parsing, BeautifulSoup DOM vs zero-DOM fast path
+
+Runs over saved realtor_*_page_*.html files (scrape_realtor_listings writes
+one per page) and reports, per page, the mean parse time and the tracemalloc
+peak for the old full-DOM extraction and for parse_realtor_page().
+
+Usage: python -m benchmarks.realtor_parse [directory] [--repeat 20]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from realtor_scrapy import parse_property_cards, parse_realtor_page
+
+
+def parse_with_dom(body: bytes):
+    """The previous extraction: full html.parser tree, then search the JSON scripts"""
+    soup = BeautifulSoup(body.decode('utf-8'), 'html.parser')
+    for script in soup.find_all('script', {'type': 'application/json'}):
+        if script.string and '"props":' in script.string:
+            try:
+                json_data = json.loads(script.string)
+                properties = json_data['props']['pageProps'].get('properties')
+                if properties:
+                    return properties
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                continue
+    return parse_property_cards(soup.decode())
+
+
+def measure(parse, body: bytes, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = parse(body)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    parse(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, len(result or [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory', nargs='?', default='.', help='Directory holding realtor_*_page_*.html')
+    parser.add_argument('--repeat', type=int, default=20, help='Parses per file for the timing')
+    args = parser.parse_args()
+
+    files = sorted(Path(args.directory).glob('realtor_*_page_*.html'))
+    if not files:
+        print(f"No realtor_*_page_*.html files in {args.directory} - run realtor_scrapy.py first")
+        return
+
+    print(f"{'file':<36}{'KB':>7}{'homes':>7}{'DOM ms':>9}{'fast ms':>9}{'DOM peak KB':>13}{'fast peak KB':>14}")
+    totals = [0.0, 0.0, 0, 0]
+    for path in files:
+        body = path.read_bytes()
+        dom_time, dom_peak, homes = measure(parse_with_dom, body, args.repeat)
+        fast_time, fast_peak, _ = measure(parse_realtor_page, body, args.repeat)
+        totals = [totals[0] + dom_time, totals[1] + fast_time, max(totals[2], dom_peak), max(totals[3], fast_peak)]
+        print(f"{path.name[:35]:<36}{len(body) / 1024:>7.0f}{homes:>7}{dom_time * 1000:>9.2f}{fast_time * 1000:>9.2f}"
+              f"{dom_peak / 1024:>13.0f}{fast_peak / 1024:>14.0f}")
+
+    n = len(files)
+    print(f"\nmean per page: DOM {totals[0] / n * 1000:.2f} ms, fast path {totals[1] / n * 1000:.2f} ms "
+          f"({totals[0] / max(totals[1], 1e-9):.1f}x); max peak: DOM {totals[2] / 1024:.0f} KB, "
+          f"fast path {totals[3] / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
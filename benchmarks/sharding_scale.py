@@ -0,0 +1,99 @@
+"""
+Benchmark: detail-phase throughput of sharded runs at 1, 2, 4 and 8 worker processes
+
+Each worker stands in for one browser: per listing it reserves a slot from the
+shared per-host budget (SharedRateLimiter), "loads" the page (asyncio.sleep for
+the browser I/O), then does the Python-side work of a real listing - building
+the record with PlaywrightLoopNetScraper._extract_property_data from a JSON-LD
+payload and serializing it for the parent - and streams the record back
+through sharding.run_shards, exactly as the scrapers do.
+
+With a single process the per-listing CPU work and every tab's event handling
+share one core; shards spread it across cores until the global request budget
+becomes the limit. Speedup is bounded by the cores available (reported).
+
+Usage: python -m benchmarks.sharding_scale [--listings 400] [--interval 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from benchmarks.loopnet_json_ld_store import listing_json_ld
+from sharding import run_shards, split_shards
+
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def simulated_shard(shard_num, links, settings, rate_limiter, result_queue):
+    """Worker process: same shape as run_loopnet_shard, with the browser simulated"""
+    logging.disable(logging.INFO)
+    from loopnetnew import PlaywrightLoopNetScraper
+
+    scraper = PlaywrightLoopNetScraper()
+    payloads = {i: listing_json_ld(i) for i in range(64)}
+    total_concurrency = settings["concurrency"]
+
+    async def listing(link, semaphore):
+        async with semaphore:
+            await rate_limiter.acquire(link["url"])
+            await asyncio.sleep(settings["page_seconds"])
+            for _ in range(settings["cpu_repeat"]):
+                record = scraper._extract_property_data({"jsonLd": payloads[link["n"] % 64]}, link["url"])
+                json.dumps(record)
+            result_queue.put({"listing_url": record["listing_url"], "shard": shard_num})
+
+    async def main():
+        semaphore = asyncio.Semaphore(total_concurrency)
+        await asyncio.gather(*(listing(link, semaphore) for link in links))
+
+    started = time.monotonic()
+    asyncio.run(main())
+    return {"shard": shard_num, "seconds": time.monotonic() - started, "throttle_wait": rate_limiter.total_wait}
+
+
+async def run(workers: int, args) -> tuple:
+    links = [{"url": f"https://www.loopnet.com/Listing/{n}/", "n": n} for n in range(args.listings)]
+    settings = {
+        # Same total number of open pages whatever the worker count
+        "concurrency": max(1, args.concurrency // workers),
+        "page_seconds": args.page_seconds,
+        "cpu_repeat": args.cpu_repeat,
+    }
+    records = []
+    started = time.monotonic()
+    stats = await run_shards(simulated_shard, split_shards(links, workers), settings,
+                             args.interval, args.interval, on_record=records.append)
+    elapsed = time.monotonic() - started
+    failures = [s for s in stats if isinstance(s, Exception)]
+    if failures:
+        raise failures[0]
+    return len(records), elapsed, sum(s["throttle_wait"] for s in stats) / len(stats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--listings', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=16, help='Open pages in total, split across workers')
+    parser.add_argument('--page-seconds', type=float, default=0.2, help='Simulated browser time per listing')
+    parser.add_argument('--cpu-repeat', type=int, default=8, help='Record builds per listing (CPU work)')
+    parser.add_argument('--interval', type=float, default=0.01, help='Global seconds between requests to the host')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{args.listings} listings, {args.concurrency} pages in total, global budget "
+          f"{1 / args.interval:.0f} requests/s, {os.cpu_count()} CPU cores")
+    print(f"{'workers':>8}{'wall (s)':>10}{'listings/min':>14}{'speedup':>9}{'mean budget wait (s)':>22}")
+    baseline = None
+    for workers in WORKER_COUNTS:
+        count, elapsed, wait = asyncio.run(run(workers, args))
+        rate = count / elapsed * 60
+        baseline = baseline or rate
+        print(f"{workers:>8}{elapsed:>10.1f}{rate:>14.0f}{rate / baseline:>9.2f}{wait:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: pages/minute for the YellowPages detail phase, blocking vs async throttling
+
+Simulates EnhancedYellowPagesScraper.process_batch with batch_size=8: each task
+holds the semaphore, throttles, "loads" a page (asyncio.sleep standing in for
+browser I/O) and then waits its post-listing delay. The old throttle_request
+called time.sleep inside the coroutine; the new one awaits AsyncRateLimiter.
+
+All timings are divided by --scale so the run finishes quickly; pages/minute is
+reported in real (unscaled) time. Throughput for a single host is bounded by
+the per-host interval either way; the "max loop stall" column shows how long
+the event loop was frozen, i.e. how long every other task (search pages, CDP
+messages, timeouts) was stuck behind a throttled request.
+
+Usage: python -m benchmarks.yellow_throttle [--pages 40] [--scale 50]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from rate_limiter import AsyncRateLimiter
+
+MIN_INTERVAL = 3
+MAX_INTERVAL = 8
+PAGE_SECONDS = (6, 12)  # navigation, scrolling, extraction
+POST_DELAY = (3, 8)  # delay between listings in process_batch
+
+
+class BlockingThrottle:
+    """The previous throttle_request: time.sleep inside the event loop"""
+
+    def __init__(self, scale: float):
+        self.scale = scale
+        self.last_request_time = 0
+
+    async def acquire(self, url: str):
+        elapsed = time.time() - self.last_request_time
+        if elapsed < MIN_INTERVAL / self.scale:
+            delay = MIN_INTERVAL + random.uniform(0, MAX_INTERVAL - MIN_INTERVAL)
+            time.sleep(delay / self.scale)
+        self.last_request_time = time.time()
+
+
+async def run(throttle, pages: int, batch_size: int, scale: float):
+    semaphore = asyncio.Semaphore(batch_size)
+    max_stall = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal max_stall
+        tick = 0.01
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(tick)
+            max_stall = max(max_stall, time.perf_counter() - started - tick)
+
+    async def listing(i: int):
+        async with semaphore:
+            await throttle.acquire(f"https://www.yellowpages.com/mip/listing-{i}")
+            await asyncio.sleep(random.uniform(*PAGE_SECONDS) / scale)
+            await asyncio.sleep(random.uniform(*POST_DELAY) / scale)
+
+    monitor = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(listing(i) for i in range(pages)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await monitor
+    return elapsed * scale, max_stall * scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=40, help='Listings to simulate')
+    parser.add_argument('--batch-size', type=int, default=8, help='Concurrent tasks (semaphore size)')
+    parser.add_argument('--scale', type=float, default=50, help='Time compression factor')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    before, before_stall = asyncio.run(run(BlockingThrottle(args.scale), args.pages, args.batch_size, args.scale))
+
+    random.seed(args.seed)
+    limiter = AsyncRateLimiter(MIN_INTERVAL / args.scale, MAX_INTERVAL / args.scale)
+    after, after_stall = asyncio.run(run(limiter, args.pages, args.batch_size, args.scale))
+
+    print(f"{args.pages} listings, batch_size={args.batch_size}, interval {MIN_INTERVAL}-{MAX_INTERVAL}s per host")
+    print(f"{'throttle':<22}{'wall time (s)':>15}{'pages/min':>12}{'max loop stall (s)':>21}")
+    print(f"{'time.sleep (before)':<22}{before:>15.1f}{args.pages / before * 60:>12.2f}{before_stall:>21.2f}")
+    print(f"{'AsyncRateLimiter':<22}{after:>15.1f}{args.pages / after * 60:>12.2f}{after_stall:>21.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: Zillow listResults decoding, BeautifulSoup + json vs typed msgspec structs
+
+Runs over saved zillow_*_page_*.html files (scrape_zillow_listings writes one
+per page) and reports decode time and tracemalloc peak, both normalized per
+1,000 homes, for:
+
+- before: BeautifulSoup finds __NEXT_DATA__, json.loads the whole document,
+  home_to_record() walks each home with .get calls
+- json: the bytes slice of __NEXT_DATA__ plus json.loads (parse_list_results(typed=False))
+- typed: the bytes slice plus msgspec decoding of listResults only
+
+Usage: python -m benchmarks.zillow_decode [directory] [--repeat 10]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+import zillow_scrapy
+from zillow_scrapy import home_to_record, parse_list_results
+
+
+def decode_before(body: bytes):
+    soup = BeautifulSoup(body.decode('utf-8'), 'html.parser')
+    data = json.loads(soup.find('script', {'id': '__NEXT_DATA__'}).string)
+    homes = data['props']['pageProps']['searchPageState']['cat1']['searchResults']['listResults']
+    return [home_to_record(home) for home in homes]
+
+
+def decode_json(body: bytes):
+    return parse_list_results(body, typed=False)
+
+
+def decode_typed(body: bytes):
+    return parse_list_results(body, typed=True)
+
+
+def measure(decode, pages, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for body in pages:
+            decode(body)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    peak = 0
+    for body in pages:
+        tracemalloc.start()
+        decode(body)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory', nargs='?', default='.', help='Directory holding zillow_*_page_*.html')
+    parser.add_argument('--repeat', type=int, default=10, help='Passes over all files for the timing')
+    args = parser.parse_args()
+
+    files = sorted(Path(args.directory).glob('zillow_*_page_*.html'))
+    if not files:
+        print(f"No zillow_*_page_*.html files in {args.directory} - run zillow_scrapy.py first")
+        return
+
+    pages = [path.read_bytes() for path in files]
+    homes = sum(len(decode_json(body) or []) for body in pages)
+    if not homes:
+        print("No listResults found in the saved pages")
+        return
+
+    decoders = [('before (bs4 + json)', decode_before), ('json slice', decode_json)]
+    if zillow_scrapy.msgspec is not None:
+        decoders.append(('typed msgspec', decode_typed))
+    else:
+        print("msgspec is not installed - skipping the typed decoder")
+
+    print(f"{len(files)} pages, {homes} homes, {sum(map(len, pages)) / 1024 / 1024:.1f} MB of HTML")
+    print(f"{'decoder':<22}{'ms / 1k homes':>15}{'peak KB / 1k homes':>21}")
+    for name, decode in decoders:
+        elapsed, peak = measure(decode, pages, args.repeat)
+        print(f"{name:<22}{elapsed / homes * 1000 * 1000:>15.2f}{peak / 1024 / (homes / len(pages)) * 1000:>21.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Content-addressed, gzip-compressed store for large raw payloads (e.g. JSON-LD)
+
+Records keep only the SHA-256 of the payload; the payload itself is written
+once to <root>/<first 2 hex chars>/<sha256>.json.gz. Identical payloads map to
+the same file, so re-scraped listings cost nothing extra.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """Write-once blobs keyed by their SHA-256"""
+
+    def __init__(self, root: Union[str, Path], suffix: str = ".json.gz", compresslevel: int = 6):
+        self.root = Path(root)
+        self.suffix = suffix
+        self.compresslevel = compresslevel
+
+        # Stats
+        self.written = 0
+        self.deduplicated = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def put(self, data: Union[str, bytes]) -> str:
+        """Store a payload and return its key"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        key = hashlib.sha256(data).hexdigest()
+        path = self.path(key)
+        self.raw_bytes += len(data)
+
+        if path.exists():
+            self.deduplicated += 1
+            return key
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = gzip.compress(data, compresslevel=self.compresslevel)
+        # Write then rename so a crash never leaves a truncated blob under its key
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(compressed)
+        os.replace(tmp, path)
+
+        self.written += 1
+        self.stored_bytes += len(compressed)
+        return key
+
+    def get(self, key: str) -> Optional[str]:
+        """Payload for a key, or None if it was never stored"""
+        path = self.path(key)
+        if not path.exists():
+            return None
+        return gzip.decompress(path.read_bytes()).decode('utf-8')
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "written": self.written,
+            "deduplicated": self.deduplicated,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        s = self.stats()
+        if not s["written"] and not s["deduplicated"]:
+            return
+        (log or logger).info(
+            f"Blob store {self.root}: {s['written']} blobs written, {s['deduplicated']} deduplicated, "
+            f"{s['raw_bytes'] / 1024:.0f} KB raw -> {s['stored_bytes'] / 1024:.0f} KB on disk"
+        )
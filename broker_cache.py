@@ -0,0 +1,110 @@
+"""
+Persistent broker contact cache
+
+Many listings share one broker. The cache maps a broker's profile URL to the
+contact details seen on their listings (name, company, image, phone), so a
+phone revealed once is reused for the broker's other listings - in this run
+and in later ones, until the entry is older than the TTL.
+
+Stored as one JSON object, loaded on open() and written back on close()
+(temp file, then rename).
+"""
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+CONTACT_FIELDS = ("broker_name", "broker_company", "broker_image", "broker_phone")
+
+
+def broker_key(profile_url: str) -> str:
+    """Profile URL without scheme, "www.", query string, case or trailing slash"""
+    parts = urlsplit(profile_url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+class BrokerCache:
+    """Broker profile URL -> contact fields, with a TTL"""
+
+    def __init__(self, path: Union[str, Path], ttl: float = 30 * 86400):
+        self.path = Path(path)
+        self.ttl = ttl  # Seconds an entry is trusted after it was last confirmed
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.is_open = False
+
+        # Stats
+        self.lookups = 0
+        self.hits = 0
+        self.expired = 0
+        self.stored = 0
+
+    def open(self):
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable broker cache {self.path}: {str(e)}")
+        self.is_open = True
+        logger.info(f"Broker cache {self.path}: {len(self.entries)} brokers")
+
+    def close(self):
+        if not self.is_open:
+            return
+        # Expired entries would only be misses next time
+        now = time.time()
+        self.entries = {key: entry for key, entry in self.entries.items() if now - entry["updated_at"] < self.ttl}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.is_open = False
+
+    def get(self, profile_url: str) -> Optional[Dict[str, Any]]:
+        """Cached contact fields of a broker with a known phone, None if unknown or expired"""
+        self.lookups += 1
+        entry = self.entries.get(broker_key(profile_url))
+        if entry is None:
+            return None
+        if time.time() - entry["updated_at"] >= self.ttl:
+            self.expired += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, profile_url: str, record: Dict[str, Any]):
+        """Remember (or refresh) a broker's contact fields from a record that has a phone"""
+        if not record.get("broker_phone"):
+            return
+        entry = {field: record.get(field) for field in CONTACT_FIELDS}
+        entry["updated_at"] = time.time()
+        self.entries[broker_key(profile_url)] = entry
+        self.stored += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "expired": self.expired,
+            "stored": self.stored,
+            "brokers": len(self.entries),
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        s = self.stats()
+        (log or logger).info(
+            f"Broker cache: {s['hits']}/{s['lookups']} lookups hit ({s['hit_rate']:.0%}), "
+            f"{s['expired']} expired, {s['stored']} phones stored, {s['brokers']} brokers cached"
+        )
@@ -0,0 +1,335 @@
+"""
+Chromium resource governor for long scraping runs
+
+Renderer memory grows over a long run until the host swaps or the OOM killer
+takes Chromium. A BrowserGovernor sits between the scraper's workers and the
+browser:
+
+- Every unit of browser work (a listing, a batch) runs in ``async with
+  governor.slot():``.
+- Once the browser has served recycle_after slots, its processes' RSS passes
+  max_rss_mb, or it disconnected, the governor stops admitting new slots,
+  waits for the running ones to finish and calls the scraper's restart
+  callback (close and relaunch). Workers waiting at the gate then carry on
+  with the new browser, so queued work is never dropped.
+- Contexts created through track_context() inside a slot belong to that
+  slot; one still open when the slot ends is a leak (typically an exception
+  path that skipped close()). It is logged and closed. Pages beyond the
+  baseline of the shared contexts are reported whenever the browser is idle.
+
+Memory is read from psutil when it is installed, else from /proc on Linux;
+elsewhere only slot counts trigger a recycle.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page
+
+try:
+    import psutil
+except ImportError:  # memory is read from /proc without it
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_NAMES = ("chrome", "chromium", "headless_shell")
+
+# Slot of the running task, so contexts it creates can be attributed to it
+_current_slot: contextvars.ContextVar = contextvars.ContextVar("browser_slot", default=None)
+
+
+def _process_tree(root_pid: int) -> List[Dict[str, object]]:
+    """Descendant processes of root_pid: pid, name, cmdline and RSS in bytes"""
+    processes = []
+    if psutil is not None:
+        try:
+            children = psutil.Process(root_pid).children(recursive=True)
+        except psutil.Error:
+            return []
+        for child in children:
+            try:
+                processes.append({"pid": child.pid, "name": child.name(), "cmdline": ' '.join(child.cmdline()),
+                                  "rss": child.memory_info().rss})
+            except psutil.Error:
+                continue
+        return processes
+
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return []
+    parents = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The name field may contain spaces: parse from the closing parenthesis
+        fields = stat[stat.rfind(')') + 2:].split()
+        parents.setdefault(int(fields[1]), []).append(int(entry.name))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    pending = list(parents.get(root_pid, []))
+    while pending:
+        pid = pending.pop()
+        pending.extend(parents.get(pid, []))
+        try:
+            name = (proc / str(pid) / "comm").read_text().strip()
+            cmdline = (proc / str(pid) / "cmdline").read_bytes().replace(b'\0', b' ').decode(errors='replace')
+            rss = int((proc / str(pid) / "statm").read_text().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        processes.append({"pid": pid, "name": name, "cmdline": cmdline, "rss": rss})
+    return processes
+
+
+def chromium_memory(root_pid: Optional[int] = None) -> Optional[Dict[str, float]]:
+    """RSS of the Chromium processes started under this process (MB; shared pages count per process)
+
+    None when process memory can't be read on this platform.
+    """
+    if psutil is None and not Path("/proc").is_dir():
+        return None
+    chromium = [p for p in _process_tree(root_pid or os.getpid())
+                if any(name in str(p["name"]).lower() for name in CHROMIUM_NAMES)]
+    renderers = [p for p in chromium if "--type=renderer" in str(p["cmdline"])]
+    mb = 1024 * 1024
+    return {
+        "total_mb": sum(p["rss"] for p in chromium) / mb,
+        "renderer_mb": sum(p["rss"] for p in renderers) / mb,
+        "renderers": len(renderers),
+        "processes": len(chromium),
+    }
+
+
+class _Slot:
+    def __init__(self):
+        self.contexts: List[BrowserContext] = []
+
+
+class BrowserGovernor:
+    """Gate for browser work that recycles the browser at a slot count or memory ceiling"""
+
+    def __init__(self, restart: Callable[[], Awaitable[None]], recycle_after: int = 500,
+                 max_rss_mb: Optional[float] = 3072.0, check_interval: float = 10.0, name: str = "browser"):
+        self.restart = restart  # Closes and relaunches the browser (and whatever hangs off it)
+        self.recycle_after = recycle_after  # Slots per browser; None = no limit
+        self.max_rss_mb = max_rss_mb  # Chromium RSS ceiling; None = no limit
+        self.check_interval = check_interval  # Seconds between memory reads
+        self.name = name
+
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        self._recycling = False
+        self._holds = 0
+        self._disconnected = False
+        self._slots_since_launch = 0
+        self._last_check = 0.0
+        self._memory: Optional[Dict[str, float]] = None
+
+        # Open contexts and their pages; shared contexts have no owning slot
+        self._contexts: Dict[BrowserContext, Optional[_Slot]] = {}
+        self._pages: Dict[BrowserContext, List[Page]] = {}
+        self._baseline_pages = 0
+
+        # Stats
+        self.slots = 0
+        self.recycles: List[str] = []
+        self.leaked_contexts = 0
+        self.leaked_pages = 0
+        self.peak_rss_mb = 0.0
+        self.peak_renderers = 0
+
+    # --- browser and context tracking ---
+
+    def attach(self, browser: Browser):
+        """Start governing a freshly launched browser"""
+        self._disconnected = False
+        self._slots_since_launch = 0
+        self._contexts.clear()
+        self._pages.clear()
+        self._baseline_pages = 0
+        browser.on("disconnected", self._on_disconnected)
+
+    def _on_disconnected(self, browser: Browser):
+        if self._recycling:
+            return
+        # With nothing running this is usually the scraper closing the browser at the end
+        if self.in_flight:
+            logger.warning(f"[{self.name}] Browser disconnected - relaunching once running work is done")
+        self._disconnected = True
+
+    def track_context(self, context: BrowserContext) -> BrowserContext:
+        """Count a context and its pages; inside a slot it must be closed before the slot ends"""
+        self._contexts[context] = _current_slot.get()
+        self._pages[context] = list(context.pages)
+        if _current_slot.get() is not None:
+            _current_slot.get().contexts.append(context)
+        context.on("page", lambda page: self._on_page(context, page))
+        context.on("close", lambda _: self._forget(context))
+        return context
+
+    def _on_page(self, context: BrowserContext, page: Page):
+        pages = self._pages.setdefault(context, [])
+        pages.append(page)
+        page.on("close", lambda _: pages.remove(page) if page in pages else None)
+
+    def _forget(self, context: BrowserContext):
+        self._contexts.pop(context, None)
+        self._pages.pop(context, None)
+
+    def open_counts(self) -> Dict[str, int]:
+        return {"contexts": len(self._contexts), "pages": sum(len(pages) for pages in self._pages.values())}
+
+    def mark_baseline(self):
+        """Pages open right now (pool, search tab) are expected whenever the browser is idle"""
+        self._baseline_pages = self._shared_pages()
+
+    def _shared_pages(self) -> int:
+        return sum(len(self._pages.get(context, [])) for context, owner in self._contexts.items() if owner is None)
+
+    # --- gate ---
+
+    @asynccontextmanager
+    async def slot(self):
+        """One unit of browser work; waits while the browser is being recycled"""
+        if self._disconnected:
+            await self._maybe_recycle()
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._recycling)
+            self.in_flight += 1
+        slot = _Slot()
+        token = _current_slot.set(slot)
+        failed = None
+        try:
+            yield
+        except BaseException as e:
+            failed = type(e).__name__
+            raise
+        finally:
+            _current_slot.reset(token)
+            await self._close_leaks(slot, failed)
+            self.slots += 1
+            self._slots_since_launch += 1
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+            if failed is None:
+                await self._maybe_recycle()
+            else:
+                # A failed restart (logged there) must not replace the body's exception
+                try:
+                    await self._maybe_recycle()
+                except Exception:
+                    pass
+
+    @asynccontextmanager
+    async def hold(self):
+        """Defer recycling for the duration of the block (e.g. while search tabs are in use)"""
+        self._holds += 1
+        try:
+            yield
+        finally:
+            self._holds -= 1
+        await self._maybe_recycle()
+
+    async def _close_leaks(self, slot: _Slot, failed: Optional[str]):
+        for context in slot.contexts:
+            browser = context.browser
+            if context not in self._contexts or (browser is not None and context not in browser.contexts):
+                self._forget(context)
+                continue
+            pages = len(self._pages.get(context, []))
+            self.leaked_contexts += 1
+            self.leaked_pages += pages
+            logger.warning(f"[{self.name}] Leaked context with {pages} open page(s) "
+                           f"{'after ' + failed if failed else 'at the end of a slot'} - closing it")
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Closing leaked context failed: {str(e)}")
+            self._forget(context)
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self._disconnected:
+            return "browser disconnected"
+        if self.recycle_after and self._slots_since_launch >= self.recycle_after:
+            return f"{self._slots_since_launch} slots served"
+        if self.max_rss_mb and time.monotonic() - self._last_check >= self.check_interval:
+            self._last_check = time.monotonic()
+            self._memory = chromium_memory()
+            if self._memory:
+                self.peak_rss_mb = max(self.peak_rss_mb, self._memory["total_mb"])
+                self.peak_renderers = max(self.peak_renderers, self._memory["renderers"])
+                if self._memory["total_mb"] >= self.max_rss_mb:
+                    return (f"Chromium RSS {self._memory['total_mb']:.0f} MB "
+                            f"({self._memory['renderers']} renderers, {self._memory['renderer_mb']:.0f} MB)")
+        return None
+
+    async def _maybe_recycle(self):
+        if self._recycling or self._holds:
+            return
+        reason = self._recycle_reason()
+        if reason is None:
+            return
+
+        self._recycling = True
+        try:
+            # Let the running slots finish on the old browser; new ones wait at the gate
+            async with self._condition:
+                await self._condition.wait_for(lambda: self.in_flight == 0)
+            self.audit()
+            logger.info(f"[{self.name}] Recycling the browser: {reason}")
+            self.recycles.append(reason)
+            await self.restart()
+        except Exception as e:
+            logger.error(f"[{self.name}] Browser restart failed: {str(e)}")
+            raise
+        finally:
+            self._recycling = False
+            async with self._condition:
+                self._condition.notify_all()
+
+    def audit(self):
+        """With no slot running, flag pages beyond the baseline and contexts left behind by slots"""
+        extra_pages = self._shared_pages() - self._baseline_pages
+        owned = [context for context, owner in self._contexts.items() if owner is not None]
+        if extra_pages > 0 or owned:
+            self.leaked_pages += max(extra_pages, 0)
+            logger.warning(f"[{self.name}] Idle browser has {max(extra_pages, 0)} page(s) beyond the "
+                           f"{self._baseline_pages} expected and {len(owned)} context(s) from finished work")
+
+    # --- reporting ---
+
+    def stats(self) -> Dict[str, object]:
+        memory = self._memory or {}
+        return {
+            "slots": self.slots,
+            "recycles": len(self.recycles),
+            "leaked_contexts": self.leaked_contexts,
+            "leaked_pages": self.leaked_pages,
+            "peak_rss_mb": self.peak_rss_mb,
+            "peak_renderers": self.peak_renderers,
+            "last_rss_mb": memory.get("total_mb", 0.0),
+            **self.open_counts(),
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        s = self.stats()
+        memory = (f"peak Chromium RSS {s['peak_rss_mb']:.0f} MB with {s['peak_renderers']} renderers"
+                  if s['peak_rss_mb'] else "memory not measured")
+        (log or logger).info(
+            f"[{self.name}] Browser governor: {s['slots']} slots, {s['recycles']} recycles, {memory}, "
+            f"{s['leaked_contexts']} leaked contexts / {s['leaked_pages']} leaked pages, "
+            f"{s['contexts']} contexts and {s['pages']} pages open now"
+        )
+        for reason in self.recycles:
+            (log or logger).info(f"[{self.name}]   recycled: {reason}")
@@ -0,0 +1,99 @@
+"""
+Append-only JSONL checkpoint for long scraping runs
+
+Each finished record (and each gathered search page) is appended as one JSON
+line and fsync'ed, so a crash, Ctrl-C or browser death loses at most the
+entry being written. load() reads the file back for a resumed run and skips a
+torn last line.
+
+Line format: {"type": "run" | "record" | "search_page" | "phone", ...}
+
+A "phone" line patches the record with the same listing_url: the phone pass
+runs after the records are written and its reveals must survive a crash too.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlCheckpoint:
+    """Durable, append-only log of a run's progress"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = None
+
+    def load(self) -> Dict[str, Any]:
+        """Read back a previous run: its run info, records and search page links"""
+        state = {"run": {}, "records": [], "search_pages": {}}
+        if not self.path.exists():
+            return state
+
+        by_url = {}
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write leaves at most one torn line
+                    logger.warning(f"Skipping unreadable checkpoint line {line_num} in {self.path}")
+                    continue
+
+                kind = entry.get("type")
+                if kind == "run":
+                    state["run"] = entry
+                elif kind == "record":
+                    state["records"].append(entry["data"])
+                    by_url[entry["data"].get("listing_url")] = entry["data"]
+                elif kind == "phone":
+                    record = by_url.get(entry["listing_url"])
+                    if record is not None:
+                        record["broker_phone"] = entry["broker_phone"]
+                elif kind == "search_page":
+                    state["search_pages"][entry["page"]] = entry["links"]
+        return state
+
+    def open(self, resume: bool, run_info: Optional[Dict[str, Any]] = None):
+        """Start appending; a fresh run moves an existing checkpoint aside to *.prev.jsonl"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume and self.path.exists():
+            os.replace(self.path, self.path.with_suffix('.prev.jsonl'))
+        # Don't glue the first new entry onto a torn last line
+        torn = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b'\n'
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if torn:
+            self._file.write('\n')
+        if run_info is not None:
+            self._append({"type": "run", **run_info})
+
+    def _append(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def add_record(self, data: Dict[str, Any]):
+        self._append({"type": "record", "data": data})
+
+    def add_search_page(self, page_num: int, links: List[Dict[str, str]]):
+        self._append({"type": "search_page", "page": page_num, "links": links})
+
+    def add_phone(self, listing_url: str, phone: str):
+        self._append({"type": "phone", "listing_url": listing_url, "broker_phone": phone})
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,297 @@
+"""
+Persistent listing frontier shared across runs
+
+Gathered listings are keyed on a canonical listing ID (canonical_listing_key)
+and checked here before they are scraped, so a listing that shows up on
+several search pages, or in every daily run, is not fetched again at full
+browser cost. Two layers, both under one directory:
+
+- seen.bloom: a Bloom filter that answers "never seen" in constant time
+  without touching the disk - the common case for a fresh listing.
+- seen.sqlite: the exact record (first seen, last seen, last scraped, times
+  seen). It is only consulted when the filter says "maybe", so a false
+  positive never drops a new listing.
+
+plan() turns a gathered batch into the listings worth scraping: new ones
+first, then known ones due for a revisit (oldest scrape first); known ones
+scraped less than revisit_after seconds ago are skipped.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import sqlite3
+import struct
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# host -> pattern whose first group is the site's listing ID
+LISTING_KEY_PATTERNS = {
+    # /Listing/<address-slug>/<id>/
+    "loopnet.com": re.compile(r"/listing/[^/]+/(\d+)", re.IGNORECASE),
+    # /<city>/mip/<business-slug>-<id>
+    "yellowpages.com": re.compile(r"/mip/[^/?#]*?-(\d+)(?:[/?#]|$)", re.IGNORECASE),
+}
+
+
+def canonical_listing_key(url: str) -> str:
+    """Stable key for a listing URL: "<host>/<listing id>" where the site has one, else host + path
+
+    Scheme, "www.", query string, fragment, case and trailing slashes are
+    ignored, so tracking parameters and slug changes don't create new keys.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().split('@')[-1].split(':')[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    pattern = LISTING_KEY_PATTERNS.get(host)
+    match = pattern.search(parts.path) if pattern else None
+    if match:
+        return f"{host}/{match.group(1)}"
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+def dedupe_links(links: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Drop links whose canonical key already appeared earlier in the list"""
+    seen = set()
+    unique = []
+    for link in links:
+        key = canonical_listing_key(link["url"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(link)
+    return unique
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, persisted as a small header plus the bit array"""
+
+    MAGIC = b"BLM1"
+    HEADER = struct.Struct("<4sQQQ")  # magic, bits, hashes, count
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.capacity = capacity
+        self.count = 0
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: Union[str, Path]):
+        """Write to a temp file, then rename: a crash never leaves a half-written filter"""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.size, self.hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["BloomFilter"]:
+        """Read a saved filter, or None if it is missing or unreadable"""
+        try:
+            with open(path, 'rb') as f:
+                magic, size, hashes, count = cls.HEADER.unpack(f.read(cls.HEADER.size))
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+        if magic != cls.MAGIC or len(bits) != (size + 7) // 8:
+            return None
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hashes, bloom.count, bloom.bits = size, hashes, count, bits
+        # Capacity the filter was sized for, at the error rate implied by its shape
+        bloom.capacity = max(1, round(size * math.log(2) / hashes))
+        return bloom
+
+
+class URLFrontier:
+    """Listings seen across runs: Bloom filter in front of an exact sqlite store"""
+
+    def __init__(self, root: Union[str, Path], capacity: int = 1_000_000, error_rate: float = 0.001,
+                 revisit_after: Optional[float] = None):
+        self.root = Path(root)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.revisit_after = revisit_after  # Seconds; known listings scraped more recently are skipped
+        self.bloom: Optional[BloomFilter] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._planned = set()  # Keys handed out this run, to dedupe across search pages
+
+        # Stats
+        self.new = 0
+        self.revisits = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.bloom_negatives = 0
+        self.false_positives = 0
+        self.scraped = 0
+
+    @property
+    def bloom_path(self) -> Path:
+        return self.root / "seen.bloom"
+
+    @property
+    def db_path(self) -> Path:
+        return self.root / "seen.sqlite"
+
+    @property
+    def is_open(self) -> bool:
+        return self._db is not None
+
+    def open(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS seen (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                last_scraped REAL,
+                times_seen INTEGER NOT NULL DEFAULT 1
+            ) WITHOUT ROWID
+        """)
+        self._db.commit()
+
+        known = self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        self.bloom = BloomFilter.load(self.bloom_path)
+        # Missing, stale after a crash, or too full for its error rate: rebuild from the exact store
+        if self.bloom is None or self.bloom.count != known or known > self.bloom.capacity:
+            self._rebuild_bloom(known)
+        logger.info(f"Frontier {self.root}: {known} listings known")
+
+    def _rebuild_bloom(self, known: int):
+        started = time.perf_counter()
+        self.bloom = BloomFilter(max(self.capacity, 2 * known), self.error_rate)
+        for (key,) in self._db.execute("SELECT key FROM seen"):
+            self.bloom.add(key)
+        logger.info(f"Rebuilt frontier Bloom filter for {known} listings in {time.perf_counter() - started:.2f} s "
+                    f"({len(self.bloom.bits) / 1024 / 1024:.1f} MB)")
+
+    def close(self):
+        if self._db is None:
+            return
+        self._db.commit()
+        self._db.close()
+        self._db = None
+        self.bloom.save(self.bloom_path)
+
+    def lookup(self, key: str) -> Optional[Tuple[float, Optional[float]]]:
+        """(last_seen, last_scraped) of a known key, None if it was never seen
+
+        None covers both a Bloom negative and a false positive (the filter
+        said "maybe", sqlite has no row); callers add the key to the filter
+        in either case.
+        """
+        return self._lookup(key, count=True)
+
+    def _lookup(self, key: str, count: bool) -> Optional[Tuple[float, Optional[float]]]:
+        # count=False for bookkeeping lookups that shouldn't show up in the filter stats
+        if key not in self.bloom:
+            if count:
+                self.bloom_negatives += 1
+            return None
+        row = self._db.execute("SELECT last_seen, last_scraped FROM seen WHERE key = ?", (key,)).fetchone()
+        if row is None and count:
+            self.false_positives += 1
+        return row
+
+    def plan(self, links: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """Record a gathered batch and return (new links, known links due for a revisit)
+
+        Revisits are ordered oldest scrape first; never-scraped known links
+        (seen before but not finished) come first among them.
+        """
+        now = time.time()
+        new, due = [], []
+        rows = []
+        for link in links:
+            key = canonical_listing_key(link["url"])
+            if key in self._planned:
+                self.duplicates += 1
+                continue
+            self._planned.add(key)
+
+            found = self.lookup(key)
+            rows.append((key, link["url"], now, now))
+            if found is None:
+                # False positives too: the key gets a row below, and open() expects
+                # the filter's count to match the rows
+                self.bloom.add(key)
+                new.append(link)
+                continue
+
+            last_scraped = found[1]
+            if (self.revisit_after is not None and last_scraped is not None
+                    and now - last_scraped < self.revisit_after):
+                self.skipped += 1
+            else:
+                due.append((last_scraped or 0.0, link))
+
+        self._db.executemany("""
+            INSERT INTO seen (key, url, first_seen, last_seen) VALUES (?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET url = excluded.url, last_seen = excluded.last_seen,
+                                           times_seen = times_seen + 1
+        """, rows)
+        self._db.commit()
+
+        due.sort(key=lambda item: item[0])
+        self.new += len(new)
+        self.revisits += len(due)
+        return new, [link for _, link in due]
+
+    def mark_scraped(self, url: str):
+        """Record a successful scrape (the listing counts as fresh until revisit_after has passed)"""
+        key = canonical_listing_key(url)
+        now = time.time()
+        if self._lookup(key, count=False) is None:
+            self.bloom.add(key)
+        self._db.execute("""
+            INSERT INTO seen (key, url, first_seen, last_seen, last_scraped) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET last_scraped = excluded.last_scraped
+        """, (key, url, now, now, now))
+        self._db.commit()
+        self.scraped += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "new": self.new,
+            "revisits": self.revisits,
+            "skipped": self.skipped,
+            "duplicates": self.duplicates,
+            "bloom_negatives": self.bloom_negatives,
+            "false_positives": self.false_positives,
+            "scraped": self.scraped,
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        s = self.stats()
+        (log or logger).info(
+            f"Frontier: {s['new']} new, {s['revisits']} due for a revisit, {s['skipped']} skipped as recently "
+            f"scraped, {s['duplicates']} duplicates in this run; {s['scraped']} marked scraped. "
+            f"Bloom filter answered {s['bloom_negatives']} lookups alone ({s['false_positives']} false positives)"
+        )
@@ -9,12 +9,28 @@ import csv
 import time
 import random
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 import re
 import logging
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 from typing import Dict, List, Any, Optional
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from adaptive_concurrency import AIMDConcurrency
+
+from blob_store import BlobStore
+from browser_governor import BrowserGovernor
+from broker_cache import CONTACT_FIELDS, BrokerCache
+from checkpoint import JsonlCheckpoint
+from frontier import URLFrontier
+from http_client import AsyncHttpFetcher
+from page_pool import PagePool
+from page_readiness import PageReadiness
+from resource_policy import ResourcePolicy
+from sharding import run_shards, split_shards
+from stage_timing import StageTimer
 
 # Set up logging
 logging.basicConfig(
@@ -23,119 +39,915 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Server-rendered bits of a listing page read by the HTTP tier
+JSON_LD_TAG = re.compile(r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I)
+LISTING_JSON_LD_TYPES = ('Apartment', 'RealEstateListing', 'Place')
+# A record with none of these came from JSON-LD without the listing details
+JSON_LD_RECORD_FIELDS = ('price', 'street_address', 'broker_name', 'description')
+TEL_LINK = re.compile(r'href=["\']tel:([^"\']+)["\']', re.I)
+PHONE_BUTTON_MARKUP = re.compile(r'container-contact-form[^"\']*has-valid-contacts')
+
+# Button that reveals the broker phone number on a listing page
+PHONE_BUTTON_SELECTOR = '#dataSection div.container-contact-form.has-valid-contacts div span button'
+
+# Phone selectors checked before clicking the reveal button, and after it
+PHONE_SELECTORS = [
+    '.contact-phone',
+    '.broker-phone',
+    '.contact-info-phone',
+    'div[class*="phone"]',
+    'a[href^="tel:"]',
+]
+REVEALED_PHONE_SELECTORS = PHONE_SELECTORS + ['span[class*="phone"]']
+
+# First phone-looking text or tel: link among the elements matching the selectors
+FIND_PHONE_JS = """
+(selectors) => {
+    for (const selector of selectors) {
+        const elements = document.querySelectorAll(selector);
+        for (const el of elements) {
+            const text = el.textContent.trim();
+            // Check if it matches a phone number pattern
+            if (/^[\d\s\(\)\.\-\+]+$/.test(text) && text.length >= 7) {
+                return text;
+            }
+            
+            // Check for href attribute
+            if (el.href && el.href.startsWith('tel:')) {
+                return el.href.replace('tel:', '');
+            }
+        }
+    }
+    
+    return null;
+}
+"""
+
+# Everything the listing pass needs in one CDP round trip: JSON-LD text, whether
+# the phone reveal button exists, and the phone number if a phone selector
+# already shows it. Clicking and text scans are left to the phone pass.
+EXTRACTION_BUNDLE_JS = """
+([buttonSelector, phoneSelectors]) => {
+    const findPhone = %s;
+    
+    const findJsonLd = () => {
+        // First try specific XPath
+        const scriptXPath = document.evaluate(
+            '/html/body/section[1]/main/section/script[2]',
+            document,
+            null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE,
+            null
+        ).singleNodeValue;
+        
+        if (scriptXPath) {
+            return scriptXPath.textContent;
+        }
+        
+        // Alternative: Try to find JSON-LD script
+        const scripts = document.querySelectorAll('script[type="application/ld+json"]');
+        for (const script of scripts) {
+            const content = script.textContent;
+            if (content && (content.includes('"@type":"Apartment"') ||
+                            content.includes('"@type":"RealEstateListing"') ||
+                            content.includes('"@type":"Place"'))) {
+                return content;
+            }
+        }
+        
+        // Backup: Try to find any script in the main section
+        const mainScripts = document.querySelectorAll('main section script');
+        for (const script of mainScripts) {
+            const content = script.textContent;
+            if (content && (content.startsWith('{') || content.startsWith('['))) {
+                return content;
+            }
+        }
+        
+        return null;
+    };
+    
+    return {
+        jsonLd: findJsonLd(),
+        buttonExists: document.querySelector(buttonSelector) !== null,
+        phone: findPhone(phoneSelectors),
+    };
+}
+""" % FIND_PHONE_JS.strip()
+
+# Phone pass: button state and any phone already shown, without the JSON-LD
+PHONE_STATE_JS = """
+([buttonSelector, phoneSelectors]) => {
+    const findPhone = %s;
+    return {
+        buttonExists: document.querySelector(buttonSelector) !== null,
+        phone: findPhone(phoneSelectors),
+    };
+}
+""" % FIND_PHONE_JS.strip()
+
+# Phone pass on pages without a reveal button: first phone-looking text node, or a tel: link
+SCAN_PHONE_TEXT_JS = """
+() => {
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT, null, false);
+    let node;
+    while (node = walker.nextNode()) {
+        const text = node.nodeValue.trim();
+        if (/^[\d\s\(\)\.\-\+]{7,20}$/.test(text)) {
+            return text;
+        }
+    }
+    
+    const telLink = document.querySelector('a[href^="tel:"]');
+    return telLink ? telLink.href.replace('tel:', '') : null;
+}
+"""
+
+
+def _is_listing_node(value: Any) -> bool:
+    if not isinstance(value, dict):
+        return False
+    types = value.get('@type')
+    types = types if isinstance(types, list) else [types]
+    return any(t in LISTING_JSON_LD_TYPES for t in types)
+
+
+def listing_json_ld_node(data: Any) -> Optional[Dict[str, Any]]:
+    """The listing object of a JSON-LD document: the document itself, or an entry of a top-level list or @graph
+
+    Objects nested under other keys (e.g. an Organization's Place) are not listings.
+    """
+    for candidate in (data if isinstance(data, list) else [data]):
+        if _is_listing_node(candidate):
+            return candidate
+        if isinstance(candidate, dict) and isinstance(candidate.get('@graph'), list):
+            for node in candidate['@graph']:
+                if _is_listing_node(node):
+                    return node
+    return None
+
+
+def extract_listing_bundle(html: str) -> Dict[str, Any]:
+    """Python counterpart of EXTRACTION_BUNDLE_JS for server-rendered listing HTML"""
+    json_ld = None
+    for match in JSON_LD_TAG.finditer(html):
+        content = match.group(1).strip()
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            continue
+        if listing_json_ld_node(data) is not None:
+            json_ld = content
+            break
+    
+    phone = TEL_LINK.search(html)
+    return {
+        "jsonLd": json_ld,
+        "buttonExists": PHONE_BUTTON_MARKUP.search(html) is not None,
+        "phone": phone.group(1).strip() if phone else None,
+    }
+
+
+# additionalProperty names -> record fields. The first spec whose substring
+# occurs in the (lowercased) property name wins; 'join' comma-joins list values,
+# 'first' keeps the first one.
+ADDITIONAL_PROPERTY_FIELDS = (
+    (('property type',), 'property_type', 'first'),
+    (('property subtype',), 'property_subtype', 'first'),
+    (('price per unit',), 'price_per_unit', 'first'),
+    (('sale type',), 'sale_type', 'first'),
+    (('sale conditions',), 'sale_conditions', 'join'),
+    (('no. units', 'num units'), 'num_units', 'first'),
+    (('building class',), 'building_class', 'first'),
+    (('lot size',), 'lot_size', 'first'),
+    (('building size',), 'building_size', 'first'),
+    (('occupancy',), 'occupancy', 'first'),
+    (('no. stories', 'num stories'), 'num_stories', 'first'),
+    (('year built',), 'year_built', 'first'),
+    (('zoning',), 'zoning', 'first'),
+    (('amenities',), 'amenities', 'join'),
+    (('walk score',), 'walk_score', 'first'),
+)
+
+SQUARE_FEET_PER_ACRE = 43560
+NUMBER = re.compile(r'(\d[\d,]*(?:\.\d+)?|\.\d+)\s*([kmb](?![a-z]))?', re.I)
+ACRES_UNIT = re.compile(r'\b(?:ac|acres?)\b', re.I)
+YEAR = re.compile(r'\b(1[6-9]\d\d|20\d\d)\b')
+
+
+@lru_cache(maxsize=None)
+def match_property_field(name: str) -> Optional[tuple]:
+    """(field, combine) for a lowercased additionalProperty name, cached per distinct name"""
+    for patterns, field, combine in ADDITIONAL_PROPERTY_FIELDS:
+        if any(pattern in name for pattern in patterns):
+            return field, combine
+    return None
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """First number in a value like '$4,200,000', '12.5K' or 4200000"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER.search(str(value))
+    if not match:
+        return None
+    number = float(match.group(1).replace(',', ''))
+    suffix = (match.group(2) or '').lower()
+    return number * {'k': 1e3, 'm': 1e6, 'b': 1e9}.get(suffix, 1)
+
+
+def parse_area(value: Any, unit: str) -> Optional[float]:
+    """Area like '12,500 SF' or '1.25 AC' converted to 'sf' or 'acres' (bare numbers are taken as SF)"""
+    number = parse_number(value)
+    if number is None:
+        return None
+    in_acres = isinstance(value, str) and ACRES_UNIT.search(value) is not None
+    if unit == 'acres':
+        return number if in_acres else number / SQUARE_FEET_PER_ACRE
+    return number * SQUARE_FEET_PER_ACRE if in_acres else number
+
+
+def parse_year(value: Any) -> Optional[int]:
+    match = YEAR.search(str(value))
+    return int(match.group(1)) if match else None
+
+
+def _whole_number(value: Any) -> Optional[int]:
+    number = parse_number(value)
+    return int(round(number)) if number is not None else None
+
+
+# Typed numeric columns added next to the raw string fields
+NUMERIC_COLUMNS = (
+    ('price', 'price_value', _whole_number),
+    ('price_per_unit', 'price_per_unit_value', parse_number),
+    ('building_size', 'building_size_sf', lambda value: parse_area(value, 'sf')),
+    ('lot_size', 'lot_size_acres', lambda value: parse_area(value, 'acres')),
+    ('year_built', 'year_built_value', parse_year),
+)
+
+
+def map_additional_properties(properties: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Record fields from a JSON-LD additionalProperty list"""
+    fields = {}
+    for prop in properties:
+        value = prop.get('value', [])
+        if not value:
+            continue
+        spec = match_property_field(prop.get('name', '').lower())
+        if spec is None:
+            continue
+        field, combine = spec
+        if isinstance(value, list):
+            value = ', '.join(value) if combine == 'join' else value[0]
+        fields[field] = value
+    return fields
+
+
+def add_numeric_columns(item: Dict[str, Any]):
+    """Add the typed NUMERIC_COLUMNS for the raw fields present in a record"""
+    for source, column, parse in NUMERIC_COLUMNS:
+        if item.get(source) not in (None, ''):
+            item[column] = parse(item[source])
+
+
 class PlaywrightLoopNetScraper:
     def __init__(self):
         # Basic configuration
         self.search_url = "https://www.loopnet.com/search/commercial-real-estate/new-york-ny/for-sale/"
         self.page_limit = 20  # Number of search results pages to scrape
         self.max_concurrent = 10  # Max number of concurrent property scrapes
+        self.adaptive_concurrency = True  # Let an AIMD controller pick the concurrency, up to max_concurrent
+        self.initial_concurrency = 4  # Starting point for the controller
+        self.target_latency = 20.0  # Mean seconds per listing under which the controller keeps growing
+        self.search_concurrency = 3  # Tabs used to load search results pages in parallel
+        self.pipeline_mode = False  # Stream listings from search pages straight into detail workers
+        self.pipeline_queue_size = 20  # Max listings waiting for a detail worker (backpressure)
         self.wait_time = 1  # Minimum wait time between actions
+        self.http_first = False  # Try detail pages over plain HTTP before using a browser page
+        
+        # Broker phones the listing pass didn't find are revealed in a separate pass afterwards
+        # (reveal button click or page text scan), phone_concurrency pages at a time.
+        # False skips the pass for bulk runs that only need listing data.
+        self.phone_enrichment = True
+        self.phone_concurrency = 3
+        self.phone_stats = {"listings": 0, "found": 0, "shared": 0, "seconds": 0.0}
+        
+        # Sharded mode: detail pages are split across worker processes, each with its own browser
+        self.shard_workers = 1  # Worker processes (1 = everything in this process)
+        self.shard_concurrency = 3  # Concurrent detail pages per worker
+        self.shard_min_interval = 1.0  # Global per-host budget shared by all workers:
+        self.shard_max_interval = 2.0  # seconds between detail requests to loopnet.com
+        self.rate_limiter = None  # Optional AsyncRateLimiter for detail requests (shared one in workers)
+        self.result_queue = None  # Set in worker processes: records go to the parent instead of the checkpoint
+        self.concurrency = None  # AIMDConcurrency of the detail phase, when adaptive
+        self.detail_limiter = None  # Semaphore or AIMDConcurrency, created on first use
+        
+        # Block images, fonts, media and trackers on detail pages (None loads everything)
+        self.resource_policy = ResourcePolicy.for_source("loopnet")
+        
+        # Detail pages are extracted as soon as their JSON-LD is in the DOM
+        self.readiness = PageReadiness.for_source("loopnet", timeout=7.0)
+        
+        # Reusable detail pages
+        self.page_pool_size = self.max_concurrent  # Pages pre-created for detail scraping
+        self.page_max_uses = 25  # Replace a pooled page after this many listings
+        
+        # Relaunch the browser between listings after this many detail pages, or once
+        # Chromium's RSS passes the ceiling (None = no limit); queued listings wait for it
+        self.recycle_after_pages = 500
+        self.max_browser_rss_mb = 3072
         
         # Data directories
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
         
+        # Keep raw JSON-LD out of the records: gzip it under output/json_ld/ by SHA-256
+        # and store only the hash in "json_ld_sha256" (off = inline "json_ld_data")
+        self.store_json_ld = False
+        self.json_ld_store = BlobStore(self.output_dir / "json_ld")
+        
+        # Every finished record and search page is appended here as it completes
+        self.checkpoint = JsonlCheckpoint(self.output_dir / "loopnet_checkpoint.jsonl")
+        self.resume = False  # Reload the checkpoint and skip work it already holds
+        self.done_listing_ids = set()
+        self.checkpoint_pages = {}
+        
+        # Listings seen by earlier runs (output/frontier/): new ones are scraped first, ones
+        # scraped less than revisit_after_days ago are skipped (None = never skip, only reorder)
+        self.use_frontier = True
+        self.revisit_after_days = 7.0
+        self.frontier = URLFrontier(self.output_dir / "frontier")
+        
+        # Broker contacts by profile URL (output/broker_cache.json): a listing without a phone
+        # takes its broker's cached one, and the phone pass reveals one listing per broker
+        self.use_broker_cache = True
+        self.broker_cache_ttl_days = 30.0
+        self.broker_cache = BrokerCache(self.output_dir / "broker_cache.json")
+        
         # Data storage
         self.listing_urls = []
         self.results = []
         
         # Initialize browser/context/page as None
+        self.playwright = None
+        self.governor = None
         self.browser = None
         self.context = None
         self.search_page = None
+        self.page_pool = None
+        self._page_resource_stats = {}
+        self.http_fetcher = None
+        self.http_tier_blocked = False
+        
+        # Listings served and time spent per fetch tier ("escalated" = HTTP tried, browser needed)
+        self.tier_stats = {tier: {"listings": 0, "seconds": 0.0} for tier in ("http", "browser", "escalated")}
+        
+        # Run timing
+        self.stages = StageTimer("loopnet")  # Latency histogram per stage (goto, readiness, clicks, pauses...)
+        self.run_started = None
+        self.first_record_at = None
+        
+        # page.evaluate round trips on listing pages
+        self.evaluate_calls = 0
+        self.evaluate_time = 0.0
+    
+    def _open_checkpoint(self):
+        """Reload the previous run's progress when resuming, then start appending to the checkpoint"""
+        if self.resume:
+            state = self.checkpoint.load()
+            self.results = state["records"]
+            self.done_listing_ids = {item.get("listing_id") for item in self.results if item.get("listing_id")}
+            # Gathered links are only valid for the same search
+            if state["run"].get("search_url") == self.search_url:
+                self.checkpoint_pages = state["search_pages"]
+            logger.info(f"Resuming from {self.checkpoint.path}: {len(self.results)} listings and "
+                        f"{len(self.checkpoint_pages)} search pages already done")
+        self.checkpoint.open(self.resume, {"search_url": self.search_url, "started_at": datetime.now().isoformat()})
+    
+    def _open_stores(self):
+        """Open the stores shared across runs: the frontier and the broker cache"""
+        if self.use_frontier:
+            self.frontier.revisit_after = None if self.revisit_after_days is None else self.revisit_after_days * 86400
+            self.frontier.open()
+        if self.use_broker_cache:
+            self.broker_cache.ttl = self.broker_cache_ttl_days * 86400
+            self.broker_cache.open()
+    
+    def _close_stores(self):
+        if self.frontier.is_open:
+            self.frontier.log_summary(logger)
+            self.frontier.close()
+        if self.broker_cache.is_open:
+            self.broker_cache.log_summary(logger)
+            self.broker_cache.close()
+    
+    def _fill_from_broker_cache(self, property_data: Dict[str, Any]):
+        """Take a missing phone from the broker cache, or refresh the cache from a record that has one"""
+        profile_url = property_data.get('broker_profile_url')
+        if not self.broker_cache.is_open or not profile_url:
+            return
+        if property_data.get('broker_phone'):
+            self.broker_cache.put(profile_url, property_data)
+            return
+        cached = self.broker_cache.get(profile_url)
+        if cached:
+            for field in CONTACT_FIELDS:
+                if not property_data.get(field) and cached.get(field):
+                    property_data[field] = cached[field]
+    
+    def _plan_links(self, links: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Order gathered links through the frontier: new listings, then revisits; recent ones dropped"""
+        if not self.use_frontier:
+            return links
+        new, revisits = self.frontier.plan(links)
+        return new + revisits
+    
+    def _already_scraped(self, property_link: Dict[str, str]) -> bool:
+        listing_id = self._extract_listing_id(property_link.get("url", ""))
+        return listing_id is not None and listing_id in self.done_listing_ids
+    
+    async def _start_browser(self, p, detail_pages: bool = True):
+        """Launch the browser and warm up the search tab; pre-create detail pages unless only searching"""
+        logger.info("Launching browser...")
+        self.playwright = p
+        self._detail_pages = detail_pages
+        self.browser = await p.chromium.launch(
+            headless=False,
+            channel="chrome",
+            args=[
+                '--disable-blink-features=AutomationControlled',
+                '--start-maximized'
+            ]
+        )
+        if self.governor is None:
+            self.governor = BrowserGovernor(self._restart_browser, self.recycle_after_pages,
+                                            self.max_browser_rss_mb, name="loopnet")
+        self.governor.attach(self.browser)
+        
+        # Create browser context
+        self.context = self.governor.track_context(await self.browser.new_context(
+            viewport=None,
+            user_agent=USER_AGENT
+        ))
+        
+        # Create page and start with Google (helps avoid detection)
+        self.search_page = await self.context.new_page()
+        await self.search_page.goto("https://www.google.com", wait_until="domcontentloaded")
+        await asyncio.sleep(0.5)
+        
+        if not detail_pages:
+            self.governor.mark_baseline()
+            return
+        
+        # Pre-create the detail pages
+        self.page_pool = PagePool(self.context, self.page_pool_size, self.page_max_uses,
+                                  setup=self._setup_detail_page)
+        await self.page_pool.start()
+        self.governor.mark_baseline()
+        
+        if self.http_first:
+            self.http_fetcher = AsyncHttpFetcher(
+                headers={
+                    "User-Agent": USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "en-US,en;q=0.9",
+                },
+                pool_size=self.max_concurrent,
+            )
+    
+    async def _close_browser(self):
+        """Close the HTTP client, pooled pages, context and browser, whichever were opened"""
+        if self.http_fetcher:
+            await self.http_fetcher.close()
+            self.http_fetcher = None
+        if self.page_pool:
+            await self.page_pool.close()
+        if self.search_page:
+            await self.search_page.close()
+        if self.context:
+            await self.context.close()
+        if self.browser:
+            await self.browser.close()
+        self.page_pool = self.search_page = self.context = self.browser = None
+        self._page_resource_stats.clear()
+    
+    async def _restart_browser(self):
+        """Governor callback, run with no listing in flight: a fresh browser, pool and search tab"""
+        await self._close_browser()
+        await self._start_browser(self.playwright, self._detail_pages)
+    
+    def _log_run_stats(self):
+        """Log the detail-phase stats: resource blocking, page pool, readiness, evaluates, fetch tiers"""
+        if self.resource_policy:
+            self.resource_policy.log_summary(logger)
+        
+        if self.concurrency:
+            self.concurrency.log_summary(logger)
+        self.page_pool.log_summary(logger)
+        self.governor.audit()
+        self.governor.log_summary(logger)
+        self.readiness.log_summary(logger)
+        browser_listings = self.tier_stats["browser"]["listings"]
+        if browser_listings:
+            logger.info(f"Listing extraction: {self.evaluate_calls / browser_listings:.2f} evaluate calls and "
+                        f"{self.evaluate_time / browser_listings * 1000:.0f} ms per browser listing")
+        if self.http_first:
+            self.log_tier_summary()
+    
+    def save_stage_timings(self):
+        """Log the per-stage latency table and write it as JSON next to the results"""
+        self.stages.log_summary(logger)
+        if self.stages.histograms:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = self.stages.dump_json(self.output_dir / f'loopnet_stage_timings_{timestamp}.json')
+            logger.info(f'Stage timings: {path}')
     
     async def run(self):
         """Main method to run the scraper"""
         try:
+            self._open_checkpoint()
+            self._open_stores()
+            
+            if self.shard_workers > 1:
+                await self.run_sharded()
+                return
+            
             async with async_playwright() as p:
-                # Launch browser
-                logger.info("Launching browser...")
-                self.browser = await p.chromium.launch(
-                    headless=False,
-                    channel="chrome",
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--start-maximized'
-                    ]
-                )
-                
-                # Create browser context
-                self.context = await self.browser.new_context(
-                    viewport=None,
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
+                await self._start_browser(p)
                 
-                # Create page and start with Google (helps avoid detection)
-                self.search_page = await self.context.new_page()
-                await self.search_page.goto("https://www.google.com", wait_until="domcontentloaded")
-                await asyncio.sleep(0.5)
+                self.run_started = time.monotonic()
+                await self.scrape_search()
                 
-                # Gather listing URLs from search pages
-                await self.gather_listing_urls()
-                
-                # Concurrently scrape individual property listings
-                if self.listing_urls:
-                    logger.info(f"Found {len(self.listing_urls)} property listings to scrape")
-                    await self.scrape_property_listings()
-                else:
-                    logger.warning("No property listings found to scrape")
+                logger.info(f"Scraping took {time.monotonic() - self.run_started:.1f} seconds")
+                self._log_run_stats()
                 
                 # Save results
                 self.save_results()
+                self.save_stage_timings()
+                
+                self.checkpoint.close()
+                self._close_stores()
                 
                 # Close browser
-                await self.search_page.close()
-                await self.context.close()
-                await self.browser.close()
+                await self._close_browser()
         
         except Exception as e:
             logger.error(f"An error occurred during scraping: {str(e)}")
             # Attempt to close browser in case of error
+            logger.info(f"Progress so far is in {self.checkpoint.path} (rerun with --resume)")
+            self.checkpoint.close()
+            self._close_stores()
             try:
-                if self.search_page:
-                    await self.search_page.close()
-                if self.context:
-                    await self.context.close()
-                if self.browser:
-                    await self.browser.close()
+                await self._close_browser()
             except:
                 pass
             raise
     
+    async def scrape_search(self):
+        """Gather and scrape the listings of self.search_url with the browser that is already open"""
+        if self.pipeline_mode:
+            # Scrape listings while search pages are still being read
+            await self.run_pipeline()
+        else:
+            # Gather listing URLs from search pages
+            await self.gather_listing_urls()
+            
+            # Concurrently scrape individual property listings
+            if self.listing_urls:
+                logger.info(f"Found {len(self.listing_urls)} property listings to scrape")
+                await self.scrape_property_listings()
+            else:
+                logger.warning("No property listings found to scrape")
+        
+        if self.phone_enrichment:
+            await self.enrich_phones()
+    
+    async def run_markets(self, markets: List[Dict[str, Any]]):
+        """Scrape several searches in one job, with one browser
+        
+        Each market is {"search_url", "page_limit", "name"}. The browser launch
+        and warm-up, the detail page pool, the concurrency limiter (with what it
+        has learned) and the frontier are shared, so a listing that shows up in
+        two markets is scraped once. Every market gets its own checkpoint and
+        results under output/markets/<name>/; --resume applies per market.
+        """
+        base_dir = self.output_dir
+        summary = []
+        self._open_stores()
+        try:
+            async with async_playwright() as p:
+                await self._start_browser(p)
+                self.run_started = time.monotonic()
+                try:
+                    for market_num, market in enumerate(markets, 1):
+                        logger.info(f"Market {market_num}/{len(markets)}: {market['name']} "
+                                    f"({market['page_limit']} pages of {market['search_url']})")
+                        started = time.monotonic()
+                        try:
+                            await self._run_market(market, base_dir / "markets" / market["name"])
+                        except Exception as e:
+                            # One bad search shouldn't cost the rest of the job
+                            logger.error(f"Market {market['name']} failed: {str(e)} "
+                                         f"(progress is in {self.checkpoint.path})")
+                        summary.append((market["name"], len(self.results), time.monotonic() - started))
+                finally:
+                    self.output_dir = base_dir
+                    await self._close_browser()
+            
+            logger.info(f"{len(markets)} markets took {time.monotonic() - self.run_started:.1f} seconds:")
+            for name, count, seconds in summary:
+                logger.info(f"  {name}: {count} listings in {seconds:.1f} s")
+            self.save_stage_timings()
+        finally:
+            self._close_stores()
+    
+    async def _run_market(self, market: Dict[str, Any], market_dir: Path):
+        """One market of run_markets: fresh per-search state, shared browser and limits"""
+        self.search_url = market["search_url"]
+        self.page_limit = market["page_limit"]
+        self.output_dir = market_dir
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.listing_urls = []
+        self.results = []
+        self.done_listing_ids = set()
+        self.checkpoint_pages = {}
+        self.first_record_at = None
+        
+        self.checkpoint = JsonlCheckpoint(market_dir / "loopnet_checkpoint.jsonl")
+        self._open_checkpoint()
+        try:
+            await self.scrape_search()
+            self._log_run_stats()
+            self.save_results()
+        finally:
+            self.checkpoint.close()
+    
+    async def run_sharded(self):
+        """Gather listings in this process, then scrape them in shard_workers processes
+        
+        Each worker runs its own browser with shard_concurrency detail pages.
+        All workers share one per-host request budget (shard_min_interval ..
+        shard_max_interval seconds between detail requests). This process
+        merges their records into self.results and the checkpoint as they
+        arrive.
+        """
+        self.run_started = time.monotonic()
+        
+        async with async_playwright() as p:
+            await self._start_browser(p, detail_pages=False)
+            try:
+                await self.gather_listing_urls()
+            finally:
+                await self._close_browser()
+        
+        pending = [link for link in self.listing_urls if not self._already_scraped(link)]
+        if not pending:
+            logger.warning("No property listings left to scrape")
+        else:
+            shards = split_shards(pending, self.shard_workers)
+            logger.info(f"Scraping {len(pending)} listings in {len(shards)} worker processes")
+            settings = {
+                "max_concurrent": self.shard_concurrency,
+                "page_pool_size": self.shard_concurrency,
+                "page_max_uses": self.page_max_uses,
+                "http_first": self.http_first,
+                "store_json_ld": self.store_json_ld,
+            }
+            shard_stats = await run_shards(run_loopnet_shard, shards, settings,
+                                           self.shard_min_interval, self.shard_max_interval,
+                                           on_record=self._store_result)
+            for stats in shard_stats:
+                if isinstance(stats, Exception):
+                    logger.error(f"Worker process failed: {str(stats)}")
+                else:
+                    self.stages.merge(stats["stage_timings"])
+                    logger.info(f"[shard {stats['shard']}] {stats['scraped']}/{stats['listings']} listings in "
+                                f"{stats['seconds']:.1f} s ({stats['throttle_wait']:.1f} s waiting for the request budget)")
+            
+            # Phone pass in this process, with a small browser of its own
+            if self.phone_enrichment and self.results:
+                self.page_pool_size = self.phone_concurrency
+                async with async_playwright() as p:
+                    await self._start_browser(p)
+                    try:
+                        await self.enrich_phones()
+                    finally:
+                        await self._close_browser()
+        
+        elapsed = time.monotonic() - self.run_started
+        logger.info(f"Scraping took {elapsed:.1f} seconds ({len(self.results) / max(elapsed, 1e-9) * 60:.1f} listings/min)")
+        self.save_results()
+        self.save_stage_timings()
+        self.checkpoint.close()
+        self._close_stores()
+    
+    async def scrape_shard(self, shard_num: int, links: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Worker side of run_sharded: scrape one shard of listings with this process's own browser"""
+        started = time.monotonic()
+        async with async_playwright() as p:
+            await self._start_browser(p)
+            try:
+                self.run_started = time.monotonic()
+                self.listing_urls = links
+                await self.scrape_property_listings()
+                self._log_run_stats()
+            finally:
+                await self._close_browser()
+        
+        return {
+            "shard": shard_num,
+            "listings": len(links),
+            "scraped": len(self.results),
+            "seconds": time.monotonic() - started,
+            "throttle_wait": self.rate_limiter.total_wait if self.rate_limiter else 0.0,
+            "stage_timings": self.stages.to_dict(),
+        }
+    
     async def gather_listing_urls(self):
-        """Collect all property listing URLs from search results pages"""
+        """Collect all property listing URLs from search results pages using a small pool of tabs"""
+        page_queue = asyncio.Queue()
         for page_num in range(1, self.page_limit + 1):
+            page_queue.put_nowait(page_num)
+        
+        # Reuse the warmed-up search tab and open extra tabs up to search_concurrency
+        tabs = [self.search_page]
+        for _ in range(max(1, min(self.search_concurrency, self.page_limit)) - 1):
+            tabs.append(await self.context.new_page())
+        
+        page_links = {}
+        try:
+            await asyncio.gather(*(self._search_page_worker(tab, page_queue, page_links) for tab in tabs))
+        finally:
+            for tab in tabs[1:]:
+                await tab.close()
+        
+        # Merge in page order, skipping listings already seen on an earlier page
+        seen_urls = {link["url"] for link in self.listing_urls}
+        gathered = []
+        for page_num in sorted(page_links):
+            for link in page_links[page_num]:
+                if link["url"] not in seen_urls:
+                    seen_urls.add(link["url"])
+                    gathered.append(link)
+        
+        # Skip or defer listings earlier runs already scraped
+        planned = self._plan_links(gathered)
+        if len(planned) < len(gathered):
+            logger.info(f"Frontier: {len(gathered) - len(planned)} of {len(gathered)} gathered "
+                        f"listings were scraped recently or are duplicates, skipping them")
+        self.listing_urls.extend(planned)
+    
+    async def _search_page_worker(self, tab: Page, page_queue: asyncio.Queue, page_links: Dict[int, List[Dict[str, str]]]):
+        """Load search pages from the queue in one tab until the queue is empty"""
+        while True:
             try:
-                # Construct URL for current page
-                if page_num == 1:
-                    url = self.search_url
-                else:
-                    url = f"{self.search_url}?page={page_num}"
-                
-                logger.info(f"Navigating to search page {page_num}: {url}")
-                
-                # Navigate to search page
-                await self.search_page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                await asyncio.sleep(1)  # Short wait for content to load
-                
-                # Wait for listing results container
-                await self.search_page.wait_for_selector('#placardSec > div.placards', timeout=20000)
-                
-                # Extract listing URLs
-                links = await self._extract_listing_urls(self.search_page, page_num)
-                
-                if links:
-                    logger.info(f"Found {len(links)} links on search page {page_num}")
-                    self.listing_urls.extend(links)
-                else:
-                    logger.warning(f"No links found on search page {page_num}")
+                page_num = page_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            
+            links = await self.scrape_search_page(tab, page_num)
+            if links:
+                page_links[page_num] = links
+            
+            # Brief pause before this tab loads its next page
+            if not page_queue.empty() and page_num not in self.checkpoint_pages:
+                await self.stages.sleep("search_pause", self.wait_time)
+    
+    def _search_page_url(self, page_num: int) -> str:
+        """URL of a search results page"""
+        if page_num == 1:
+            return self.search_url
+        return f"{self.search_url}?page={page_num}"
+    
+    async def scrape_search_page(self, page: Page, page_num: int) -> List[Dict[str, str]]:
+        """Load one search results page in the given tab and extract its listing links"""
+        if page_num in self.checkpoint_pages:
+            logger.info(f"Search page {page_num} already gathered, using checkpoint")
+            return self.checkpoint_pages[page_num]
+        
+        try:
+            url = self._search_page_url(page_num)
+            logger.info(f"Navigating to search page {page_num}: {url}")
+            
+            # Navigate to search page
+            with self.stages.time("search_goto"):
+                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await self.stages.sleep("search_settle_sleep", 1)  # Short wait for content to load
+            
+            # Wait for listing results container
+            with self.stages.time("search_wait_for_selector"):
+                await page.wait_for_selector('#placardSec > div.placards', timeout=20000)
+            
+            # Extract listing URLs
+            with self.stages.time("search_extract_links"):
+                links = await self._extract_listing_urls(page, page_num)
+            
+            if links:
+                logger.info(f"Found {len(links)} links on search page {page_num}")
+                self.checkpoint.add_search_page(page_num, links)
+            else:
+                logger.warning(f"No links found on search page {page_num}")
+            
+            return links
+            
+        except Exception as e:
+            logger.error(f"Error on search page {page_num}: {str(e)}")
+            return []
+    
+    async def run_pipeline(self):
+        """Scrape listings as search pages produce them, with a fixed pool of detail workers
+        
+        Search tabs put each new listing on a bounded queue and block when it
+        is full, so memory stays flat however many listings the search yields.
+        max_concurrent workers take listings off the queue as they arrive.
+        """
+        page_queue = asyncio.Queue()
+        for page_num in range(1, self.page_limit + 1):
+            page_queue.put_nowait(page_num)
+        
+        detail_queue = asyncio.Queue(maxsize=self.pipeline_queue_size)
+        seen_urls = {link["url"] for link in self.listing_urls}
+        listing_count = 0
+        
+        # Workers never exceed max_concurrent; the limiter may hold them to fewer
+        semaphore = self._detail_limiter()
+        
+        async def search_producer(tab: Page):
+            nonlocal listing_count
+            while True:
+                try:
+                    page_num = page_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
                 
-                # Brief pause between pages
-                if page_num < self.page_limit:
-                    await asyncio.sleep(self.wait_time)
+                links = self._plan_links(await self.scrape_search_page(tab, page_num))
+                for link in links:
+                    if link["url"] in seen_urls or self._already_scraped(link):
+                        continue
+                    seen_urls.add(link["url"])
+                    listing_count += 1
+                    # Blocks while the detail workers are behind
+                    await detail_queue.put((listing_count, link))
                 
-            except Exception as e:
-                logger.error(f"Error on search page {page_num}: {str(e)}")
+                if not page_queue.empty() and page_num not in self.checkpoint_pages:
+                    await self.stages.sleep("search_pause", self.wait_time)
+        
+        async def detail_worker():
+            while True:
+                item = await detail_queue.get()
+                try:
+                    if item is None:
+                        return
+                    property_num, property_link = item
+                    await self.scrape_property_listing(property_link, property_num, semaphore)
+                finally:
+                    detail_queue.task_done()
+        
+        async def search_producers():
+            # The browser isn't recycled while search tabs are open on it
+            async with self.governor.hold():
+                tabs = [self.search_page]
+                try:
+                    for _ in range(max(1, min(self.search_concurrency, self.page_limit)) - 1):
+                        tabs.append(await self.context.new_page())
+                    await asyncio.gather(*(search_producer(tab) for tab in tabs))
+                finally:
+                    for tab in tabs[1:]:
+                        await tab.close()
+        
+        workers = [asyncio.create_task(detail_worker()) for _ in range(self.max_concurrent)]
+        producers = asyncio.create_task(search_producers())
+        
+        try:
+            # Watch the workers too: if they all died, producers would block on the full queue forever
+            await asyncio.wait({producers, *workers}, return_when=asyncio.FIRST_COMPLETED)
+            for worker in workers:
+                if worker.done():
+                    # Workers only return after their stop signal, so this one failed
+                    producers.cancel()
+                    worker.result()
+                    raise RuntimeError("Detail worker stopped before the search pages were done")
+            producers.result()
+            logger.info(f"Search pages done, {listing_count} listings queued in total")
+            
+            # One stop signal per worker, after the last listing
+            for _ in workers:
+                await detail_queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            if not producers.done():
+                producers.cancel()
+            # Let the producers close their search tabs before the browser goes
+            await asyncio.gather(producers, return_exceptions=True)
+            for worker in workers:
+                worker.cancel()
+        
+        logger.info(f"Pipeline scraped {len(self.results)} properties out of {listing_count}")
     
     async def _extract_listing_urls(self, page: Page, page_num: int) -> List[Dict[str, str]]:
         """Extract property listing URLs from a search results page"""
@@ -190,12 +1002,17 @@ class PlaywrightLoopNetScraper:
     
     async def scrape_property_listings(self):
         """Scrape individual property listings concurrently"""
-        # Create semaphore to limit concurrency
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Create semaphore (or adaptive controller) to limit concurrency
+        semaphore = self._detail_limiter()
+        
+        # Listings finished in a previous run are in the checkpoint already
+        pending = [link for link in self.listing_urls if not self._already_scraped(link)]
+        if len(pending) < len(self.listing_urls):
+            logger.info(f"Skipping {len(self.listing_urls) - len(pending)} listings already in the checkpoint")
         
         # Create tasks for each property listing
         tasks = []
-        for i, property_link in enumerate(self.listing_urls):
+        for i, property_link in enumerate(pending):
             task = self.scrape_property_listing(
                 property_link=property_link,
                 property_num=i+1,
@@ -211,8 +1028,36 @@ class PlaywrightLoopNetScraper:
         success_count = sum(1 for r in results if r is not None and not isinstance(r, Exception))
         logger.info(f"Successfully scraped {success_count} properties out of {len(tasks)}")
     
-    async def scrape_property_listing(self, property_link: Dict[str, str], property_num: int, semaphore: asyncio.Semaphore):
-        """Scrape a single property listing with concurrency control"""
+    def _detail_limiter(self):
+        """Concurrency limit for detail pages: an AIMD controller, or a fixed semaphore
+        
+        Created once, so the markets of a run_markets job share it.
+        """
+        if self.detail_limiter is None:
+            if self.adaptive_concurrency:
+                self.concurrency = AIMDConcurrency(
+                    initial=min(self.initial_concurrency, self.max_concurrent),
+                    max_limit=self.max_concurrent,
+                    target_latency=self.target_latency,
+                    name="loopnet",
+                )
+                self.detail_limiter = self.concurrency
+            else:
+                self.detail_limiter = asyncio.Semaphore(self.max_concurrent)
+        return self.detail_limiter
+    
+    def _overload(self, reason: str):
+        """Tell the concurrency controller this listing hit a timeout or a block"""
+        if self.concurrency:
+            self.concurrency.overload(reason)
+    
+    async def scrape_property_listing(self, property_link: Dict[str, str], property_num: int, semaphore):
+        """Scrape a single property listing with concurrency control (a Semaphore or AIMDConcurrency)"""
+        # Wait for the request budget before taking a slot, so the wait isn't counted as latency
+        if self.rate_limiter and property_link.get("url"):
+            with self.stages.time("rate_limit_wait"):
+                await self.rate_limiter.acquire(property_link["url"])
+        
         async with semaphore:
             property_url = property_link.get("url")
             property_title = property_link.get("title", "Unknown Property")
@@ -223,167 +1068,274 @@ class PlaywrightLoopNetScraper:
             logger.info(f"[{property_num}] Scraping property: {property_title}")
             logger.info(f"URL: {property_url}")
             
+            # Tier 1: plain HTTP, when the listing data is in the server-rendered HTML
+            escalated = False
+            if self.http_first and not self.http_tier_blocked:
+                started = time.monotonic()
+                property_data = await self._scrape_listing_http(property_url, property_num)
+                if property_data:
+                    self._count_tier("http", started)
+                    return self._add_result(property_data, property_num)
+                self._count_tier("escalated", started)
+                escalated = True
+            
+            # Tier 2: full browser page
+            started = time.monotonic()
             try:
-                # Create a new page for this property
-                property_page = await self.context.new_page()
-                
-                try:
-                    # Navigate to property page
-                    await property_page.goto(property_url, wait_until="domcontentloaded", timeout=30000)
+                # Check out a pre-created page for this property
+                async with self.governor.slot(), self.page_pool.page() as property_page:
+                    resource_stats = self._page_resource_stats.get(property_page)
                     
-                    # Wait for important content to load
                     try:
-                        await property_page.wait_for_selector('section[class*="listing-features"]', timeout=5000)
-                    except:
-                        # If specific selector fails, wait for any content
-                        await asyncio.sleep(2)
-                    
-                    # Extract and process property data
-                    property_data = await self._extract_property_data(property_page, property_url)
-                    
-                    # Extract phone number
-                    phone_number = await self._extract_phone_number(property_page)
-                    if phone_number:
-                        property_data['broker_phone'] = phone_number
-                    
-                    if property_data:
-                        # Add to results list
-                        self.results.append(property_data)
-                        logger.info(f"Successfully extracted data for property {property_num}")
-                        return property_data
-                    else:
-                        logger.warning(f"No data extracted for property {property_num}")
-                        return None
-                    
-                finally:
-                    # Always close the page when done
-                    await property_page.close()
+                        # Navigate to property page and wait until the listing data is there
+                        with self.readiness.track(property_page) as probe:
+                            with self.stages.time("detail_goto"):
+                                await property_page.goto(property_url, wait_until="commit", timeout=30000)
+                            with self.stages.time("readiness_wait"):
+                                ready = await probe.wait()
+                        if probe.document_status in (403, 429):
+                            self._overload(f"status {probe.document_status}")
+                        elif not ready and self.concurrency:
+                            self.concurrency.mark_failed("not ready")
+                        logger.info(f"[{property_num}] {'Ready' if ready else 'Not ready'} after "
+                                    f"{self.readiness.times[-1]:.2f} s")
+                        
+                        # Pull JSON-LD, phone candidates and button state in one round trip
+                        evaluate_stats = {"calls": 0, "time": 0.0}
+                        with self.stages.time("extract_bundle"):
+                            bundle = await self._evaluate(property_page, EXTRACTION_BUNDLE_JS,
+                                                          [PHONE_BUTTON_SELECTOR, PHONE_SELECTORS], evaluate_stats)
+                        
+                        # Extract and process property data; a phone that needs the reveal
+                        # button is left to the phone pass
+                        property_data = self._extract_property_data(bundle, property_url)
+                        if property_data and bundle["phone"]:
+                            property_data.setdefault('broker_phone', bundle["phone"])
+                        
+                        logger.info(f"[{property_num}] {evaluate_stats['calls']} evaluate call(s), "
+                                    f"{evaluate_stats['time'] * 1000:.0f} ms")
+                        
+                        if property_data:
+                            if escalated:
+                                logger.info(f"[{property_num}] Served by the browser after HTTP escalation")
+                            return self._add_result(property_data, property_num)
+                        else:
+                            logger.warning(f"No data extracted for property {property_num}")
+                            return None
+                        
+                    finally:
+                        if resource_stats:
+                            self.resource_policy.add_page(resource_stats)
+                            logger.info(f"[{property_num}] {resource_stats.summary()}")
+                            resource_stats.reset()
             
             except Exception as e:
                 logger.error(f"Error scraping property {property_num} ({property_url}): {str(e)}")
+                if isinstance(e, PlaywrightTimeoutError):
+                    self._overload("timeout")
+                elif self.concurrency:
+                    self.concurrency.mark_failed(type(e).__name__)
                 return None
+            
+            finally:
+                self._count_tier("browser", started)
     
-    async def _extract_phone_number(self, page: Page) -> Optional[str]:
-        """Extract broker phone number from property page"""
+    def _add_result(self, property_data: Dict[str, Any], property_num: int) -> Dict[str, Any]:
+        """Add a scraped property to the results, or hand it to the parent process in a sharded worker"""
+        if self.result_queue is not None:
+            self.results.append(property_data)
+            self.result_queue.put(property_data)
+        else:
+            self._store_result(property_data)
+        logger.info(f"Successfully extracted data for property {property_num}")
+        return property_data
+    
+    def _store_result(self, property_data: Dict[str, Any]):
+        """Add a record to the results list and the checkpoint"""
+        self._fill_from_broker_cache(property_data)
+        self.results.append(property_data)
+        self.checkpoint.add_record(property_data)
+        if self.frontier.is_open and property_data.get("listing_url"):
+            self.frontier.mark_scraped(property_data["listing_url"])
+        if self.first_record_at is None and self.run_started is not None:
+            self.first_record_at = time.monotonic()
+            logger.info(f"Time to first record: {self.first_record_at - self.run_started:.1f} seconds")
+    
+    async def _scrape_listing_http(self, property_url: str, property_num: int) -> Optional[Dict[str, Any]]:
+        """Tier 1: fetch the listing HTML and parse its JSON-LD; None means the browser is needed"""
         try:
-            # Method 1: Try to find the phone number button and click it if needed
-            phone_button_selector = '#dataSection div.container-contact-form.has-valid-contacts div span button'
-            
-            # Check if the button exists
-            button_exists = await page.evaluate(f"""
-                () => {{
-                    const button = document.querySelector('{phone_button_selector}');
-                    return button !== null;
-                }}
-            """)
-            
-            if button_exists:
-                # First try to see if phone number is already visible
-                phone_number = await page.evaluate("""
-                    () => {
-                        // Try various selectors for phone numbers
-                        const selectors = [
-                            '.contact-phone',
-                            '.broker-phone',
-                            '.contact-info-phone',
-                            'div[class*="phone"]',
-                            'a[href^="tel:"]'
-                        ];
-                        
-                        for (const selector of selectors) {
-                            const elements = document.querySelectorAll(selector);
-                            for (const el of elements) {
-                                const text = el.textContent.trim();
-                                // Check if it matches a phone number pattern
-                                if (/^[\d\s\(\)\.\-\+]+$/.test(text) && text.length >= 7) {
-                                    return text;
-                                }
-                                
-                                // Check for href attribute
-                                if (el.href && el.href.startsWith('tel:')) {
-                                    return el.href.replace('tel:', '');
-                                }
-                            }
-                        }
-                        
-                        return null;
-                    }
-                """)
-                
-                if not phone_number:
-                    # Click the button to reveal the phone number
-                    try:
-                        await page.click(phone_button_selector)
-                        # Wait a moment for the number to appear
-                        await asyncio.sleep(0.5)
-                        
-                        # Now try to extract the revealed phone number
-                        phone_number = await page.evaluate("""
-                            () => {
-                                // Check for newly revealed phone elements
-                                const selectors = [
-                                    '.contact-phone',
-                                    '.broker-phone',
-                                    '.contact-info-phone',
-                                    'div[class*="phone"]',
-                                    'a[href^="tel:"]',
-                                    'span[class*="phone"]'
-                                ];
-                                
-                                for (const selector of selectors) {
-                                    const elements = document.querySelectorAll(selector);
-                                    for (const el of elements) {
-                                        const text = el.textContent.trim();
-                                        // Check if it matches a phone number pattern
-                                        if (/^[\d\s\(\)\.\-\+]+$/.test(text) && text.length >= 7) {
-                                            return text;
-                                        }
-                                        
-                                        // Check for href attribute
-                                        if (el.href && el.href.startsWith('tel:')) {
-                                            return el.href.replace('tel:', '');
-                                        }
-                                    }
-                                }
-                                
-                                return null;
-                            }
-                        """)
-                    except Exception as e:
-                        logger.warning(f"Error clicking phone button: {str(e)}")
-                
+            with self.stages.time("http_fetch"):
+                response = await self.http_fetcher.get(property_url)
+        except Exception as e:
+            logger.warning(f"[{property_num}] HTTP fetch failed, using the browser: {str(e)}")
+            return None
+        
+        if response.status_code in (403, 429):
+            # Bot wall: stop trying the HTTP tier for the rest of the run
+            logger.warning(f"[{property_num}] HTTP tier got status {response.status_code}, "
+                           f"sending all remaining listings to the browser")
+            self.http_tier_blocked = True
+            self._overload(f"status {response.status_code}")
+            return None
+        if response.status_code != 200:
+            logger.info(f"[{property_num}] HTTP status {response.status_code}, using the browser")
+            return None
+        
+        bundle = extract_listing_bundle(response.text)
+        if not bundle["jsonLd"]:
+            logger.info(f"[{property_num}] No JSON-LD in server HTML, using the browser")
+            return None
+        
+        property_data = self._extract_property_data(bundle, property_url)
+        if property_data and not any(property_data.get(field) for field in JSON_LD_RECORD_FIELDS):
+            logger.info(f"[{property_num}] No listing fields in the server JSON-LD, using the browser")
+            return None
+        if property_data and bundle["phone"]:
+            property_data.setdefault('broker_phone', bundle["phone"])
+        return property_data
+    
+    def _count_tier(self, tier: str, started: float):
+        elapsed = time.monotonic() - started
+        self.tier_stats[tier]["listings"] += 1
+        self.tier_stats[tier]["seconds"] += elapsed
+        self.stages.record(f"listing_{tier}", elapsed)
+    
+    def log_tier_summary(self):
+        """Log how many listings each fetch tier served and the per-listing speedup of the HTTP tier"""
+        http, browser, escalated = (self.tier_stats[t] for t in ("http", "browser", "escalated"))
+        http_avg = http["seconds"] / http["listings"] if http["listings"] else 0.0
+        browser_avg = browser["seconds"] / browser["listings"] if browser["listings"] else 0.0
+        logger.info(f"Tiered fetch: {http['listings']} listings over HTTP ({http_avg:.2f} s each), "
+                    f"{browser['listings']} in the browser ({browser_avg:.2f} s each, "
+                    f"{escalated['listings']} escalated after {escalated['seconds']:.1f} s of HTTP attempts)")
+        if http_avg and browser_avg:
+            logger.info(f"HTTP tier is {browser_avg / http_avg:.1f}x faster per listing "
+                        f"({60 / http_avg:.0f} vs {60 / browser_avg:.1f} listings/min per worker)")
+    
+    async def _setup_detail_page(self, page: Page):
+        """One-time setup of a pooled detail page"""
+        if self.resource_policy:
+            self._page_resource_stats[page] = await self.resource_policy.install(page)
+    
+    async def _evaluate(self, page: Page, script: str, arg: Any, stats: Dict[str, float]) -> Any:
+        """page.evaluate that counts the round trip for the listing and the run"""
+        started = time.perf_counter()
+        try:
+            return await page.evaluate(script, arg)
+        finally:
+            elapsed = time.perf_counter() - started
+            stats["calls"] += 1
+            stats["time"] += elapsed
+            self.evaluate_calls += 1
+            self.evaluate_time += elapsed
+    
+    async def enrich_phones(self):
+        """Phone pass: find broker phones for scraped listings that came without one
+        
+        Runs after the listing pass with its own limit of phone_concurrency
+        pages, so listing slots are never held for clicks, reveal waits and
+        text scans.
+        """
+        pending = [item for item in self.results if not item.get('broker_phone') and item.get('listing_url')]
+        if not pending:
+            return
+        
+        # With the broker cache on, reveal one listing per broker and share its phone
+        groups = {}
+        for num, item in enumerate(pending, 1):
+            key = (self.broker_cache.is_open and item.get('broker_profile_url')) or item['listing_url']
+            groups.setdefault(key, []).append((num, item))
+        
+        logger.info(f"Phone pass: {len(pending)} of {len(self.results)} listings ({len(groups)} brokers) have no phone yet")
+        semaphore = asyncio.Semaphore(self.phone_concurrency)
+        started = time.monotonic()
+        found = await asyncio.gather(*(self._enrich_broker(items, semaphore) for items in groups.values()))
+        elapsed = time.monotonic() - started
+        
+        self.phone_stats["listings"] += len(pending)
+        self.phone_stats["found"] += sum(found)
+        self.phone_stats["seconds"] += elapsed
+        logger.info(f"Phone pass: found {sum(found)} of {len(pending)} phones in {elapsed:.1f} seconds "
+                    f"({self.phone_stats['shared']} shared from another listing of the same broker)")
+    
+    async def _enrich_broker(self, items: List[tuple], semaphore: asyncio.Semaphore) -> int:
+        """Reveal listings of one broker in turn until a phone turns up, then give it to the rest"""
+        revealed = None
+        found = 0
+        for num, item in items:
+            if revealed is None:
+                if await self._enrich_phone(item, num, semaphore):
+                    revealed = item
+                    found += 1
+                    self._fill_from_broker_cache(item)
+            else:
+                item['broker_phone'] = revealed['broker_phone']
+                self.checkpoint.add_phone(item['listing_url'], item['broker_phone'])
+                self.phone_stats["shared"] += 1
+                found += 1
+        return found
+    
+    async def _enrich_phone(self, item: Dict[str, Any], num: int, semaphore: asyncio.Semaphore) -> bool:
+        """Reopen one listing and reveal its broker phone; True if one was found"""
+        url = item['listing_url']
+        if self.rate_limiter:
+            with self.stages.time("rate_limit_wait"):
+                await self.rate_limiter.acquire(url)
+        
+        async with semaphore:
+            try:
+                with self.stages.time("phone_listing"):
+                    async with self.governor.slot(), self.page_pool.page() as page:
+                        resource_stats = self._page_resource_stats.get(page)
+                        try:
+                            with self.readiness.track(page) as probe:
+                                with self.stages.time("phone_goto"):
+                                    await page.goto(url, wait_until="commit", timeout=30000)
+                                with self.stages.time("phone_readiness_wait"):
+                                    await probe.wait()
+                            
+                            evaluate_stats = {"calls": 0, "time": 0.0}
+                            state = await self._evaluate(page, PHONE_STATE_JS,
+                                                         [PHONE_BUTTON_SELECTOR, PHONE_SELECTORS], evaluate_stats)
+                            phone_number = await self._extract_phone_number(page, state, evaluate_stats)
+                        finally:
+                            if resource_stats:
+                                self.resource_policy.add_page(resource_stats)
+                                resource_stats.reset()
+            except Exception as e:
+                logger.warning(f"[phone {num}] Failed for {url}: {str(e)}")
+                return False
+        
+        if not phone_number:
+            return False
+        item['broker_phone'] = phone_number
+        # Records are already in the checkpoint; a resumed run must not reveal this one again
+        self.checkpoint.add_phone(url, phone_number)
+        return True
+    
+    async def _extract_phone_number(self, page: Page, state: Dict[str, Any], evaluate_stats: Dict[str, float]) -> Optional[str]:
+        """Extract broker phone number: click the reveal button if there is one, else scan the page text"""
+        try:
+            phone_number = state.get("phone")
+            if phone_number:
                 return phone_number
             
-            # Method 2: Alternative approach - look for phone patterns in the page
-            phone_number = await page.evaluate("""
-                () => {
-                    // Look for elements that might contain phone numbers
-                    const textNodes = [];
-                    const walker = document.createTreeWalker(
-                        document.body, 
-                        NodeFilter.SHOW_TEXT,
-                        null,
-                        false
-                    );
-                    
-                    let node;
-                    while (node = walker.nextNode()) {
-                        const text = node.nodeValue.trim();
-                        // Simple phone number pattern check
-                        if (/^[\d\s\(\)\.\-\+]{7,20}$/.test(text)) {
-                            textNodes.push(text);
-                        }
-                    }
-                    
-                    // Also check for tel: links
-                    const telLinks = document.querySelectorAll('a[href^="tel:"]');
-                    for (const link of telLinks) {
-                        textNodes.push(link.href.replace('tel:', ''));
-                    }
-                    
-                    return textNodes.length > 0 ? textNodes[0] : null;
-                }
-            """)
+            if not state.get("buttonExists"):
+                with self.stages.time("phone_text_scan"):
+                    return await self._evaluate(page, SCAN_PHONE_TEXT_JS, None, evaluate_stats)
+            
+            # Click the button to reveal the phone number
+            try:
+                with self.stages.time("phone_click"):
+                    await page.click(PHONE_BUTTON_SELECTOR)
+                # Wait a moment for the number to appear
+                await self.stages.sleep("phone_reveal_sleep", 0.5)
+                
+                # Now try to extract the revealed phone number
+                with self.stages.time("phone_rescan"):
+                    phone_number = await self._evaluate(page, FIND_PHONE_JS, REVEALED_PHONE_SELECTORS, evaluate_stats)
+            except Exception as e:
+                logger.warning(f"Error clicking phone button: {str(e)}")
             
             return phone_number
             
@@ -391,8 +1343,8 @@ class PlaywrightLoopNetScraper:
             logger.error(f"Error extracting phone number: {str(e)}")
             return None
     
-    async def _extract_property_data(self, page: Page, url: str) -> Optional[Dict[str, Any]]:
-        """Extract detailed data from a property listing page"""
+    def _extract_property_data(self, bundle: Dict[str, Any], url: str) -> Optional[Dict[str, Any]]:
+        """Build a property record from the extraction bundle of a listing page"""
         try:
             # Initialize item with basic data
             item = {
@@ -401,51 +1353,17 @@ class PlaywrightLoopNetScraper:
                 "scraped_at": datetime.now().isoformat()
             }
             
-            # Extract JSON-LD data from script tag
-            json_ld_script = await page.evaluate("""
-                () => {
-                    // First try specific XPath
-                    const scriptXPath = document.evaluate(
-                        '/html/body/section[1]/main/section/script[2]',
-                        document,
-                        null,
-                        XPathResult.FIRST_ORDERED_NODE_TYPE,
-                        null
-                    ).singleNodeValue;
-                    
-                    if (scriptXPath) {
-                        return scriptXPath.textContent;
-                    }
-                    
-                    // Alternative: Try to find JSON-LD script
-                    const scripts = document.querySelectorAll('script[type="application/ld+json"]');
-                    for (const script of scripts) {
-                        const content = script.textContent;
-                        if (content && content.includes('"@type":"Apartment"') || 
-                            content.includes('"@type":"RealEstateListing"') ||
-                            content.includes('"@type":"Place"')) {
-                            return content;
-                        }
-                    }
-                    
-                    // Backup: Try to find any script in the main section
-                    const mainScripts = document.querySelectorAll('main section script');
-                    for (const script of mainScripts) {
-                        const content = script.textContent;
-                        if (content && (content.startsWith('{') || content.startsWith('['))) {
-                            return content;
-                        }
-                    }
-                    
-                    return null;
-                }
-            """)
+            json_ld_script = bundle.get("jsonLd")
             
             if json_ld_script:
                 try:
-                    # Parse JSON data
-                    json_data = json.loads(json_ld_script)
-                    item["json_ld_data"] = json_ld_script
+                    # Parse JSON data; fields are read from the listing node
+                    document = json.loads(json_ld_script)
+                    json_data = listing_json_ld_node(document) or (document if isinstance(document, dict) else {})
+                    if self.store_json_ld:
+                        item["json_ld_sha256"] = self.json_ld_store.put(json_ld_script)
+                    else:
+                        item["json_ld_data"] = json_ld_script
                     
                     # Extract specific fields from JSON-LD
                     if 'offers' in json_data and len(json_data['offers']) > 0:
@@ -455,43 +1373,7 @@ class PlaywrightLoopNetScraper:
                     
                     # Extract property details from additionalProperty
                     if 'additionalProperty' in json_data:
-                        for prop in json_data['additionalProperty']:
-                            name = prop.get('name', '').lower()
-                            value = prop.get('value', [])
-                            
-                            if not value:
-                                continue
-                                
-                            if 'property type' in name:
-                                item['property_type'] = value[0] if isinstance(value, list) else value
-                            elif 'property subtype' in name:
-                                item['property_subtype'] = value[0] if isinstance(value, list) else value
-                            elif 'price per unit' in name:
-                                item['price_per_unit'] = value[0] if isinstance(value, list) else value
-                            elif 'sale type' in name:
-                                item['sale_type'] = value[0] if isinstance(value, list) else value
-                            elif 'sale conditions' in name:
-                                item['sale_conditions'] = ', '.join(value) if isinstance(value, list) else value
-                            elif 'no. units' in name or 'num units' in name:
-                                item['num_units'] = value[0] if isinstance(value, list) else value
-                            elif 'building class' in name:
-                                item['building_class'] = value[0] if isinstance(value, list) else value
-                            elif 'lot size' in name:
-                                item['lot_size'] = value[0] if isinstance(value, list) else value
-                            elif 'building size' in name:
-                                item['building_size'] = value[0] if isinstance(value, list) else value
-                            elif 'occupancy' in name:
-                                item['occupancy'] = value[0] if isinstance(value, list) else value
-                            elif 'no. stories' in name or 'num stories' in name:
-                                item['num_stories'] = value[0] if isinstance(value, list) else value
-                            elif 'year built' in name:
-                                item['year_built'] = value[0] if isinstance(value, list) else value
-                            elif 'zoning' in name:
-                                item['zoning'] = value[0] if isinstance(value, list) else value
-                            elif 'amenities' in name:
-                                item['amenities'] = ', '.join(value) if isinstance(value, list) else value
-                            elif 'walk score' in name:
-                                item['walk_score'] = value if isinstance(value, (int, float)) else value[0] if isinstance(value, list) else value
+                        item.update(map_additional_properties(json_data['additionalProperty']))
                     
                     # Extract address information
                     if 'contentLocation' in json_data and 'address' in json_data['contentLocation']:
@@ -511,11 +1393,16 @@ class PlaywrightLoopNetScraper:
                         if 'image' in provider and 'url' in provider['image']:
                             item['broker_image'] = provider['image'].get('url')
                         item['broker_profile_url'] = provider.get('@id')
+                        if provider.get('telephone'):
+                            item['broker_phone'] = provider['telephone']
                     
                     # Extract description and images
                     item['description'] = json_data.get('description')
                     item['images'] = json_data.get('image')
                     
+                    # Numbers for sorting and filtering
+                    add_numeric_columns(item)
+                    
                 except json.JSONDecodeError as e:
                     logger.error(f"Failed to parse JSON-LD data for {url}: {str(e)}")
             
@@ -558,6 +1445,8 @@ class PlaywrightLoopNetScraper:
             writer.writerows(self.results)
         
         logger.info(f'Saved {len(self.results)} items to {self.output_dir}')
+        if self.store_json_ld:
+            self.json_ld_store.log_summary(logger)
         logger.info(f'JSON file: {json_file}')
         logger.info(f'CSV file: {csv_file}')
         
@@ -566,6 +1455,51 @@ class PlaywrightLoopNetScraper:
         logger.info(f'Found phone numbers for {phone_count} out of {len(self.results)} listings')
 
 
+def run_loopnet_shard(shard_num: int, links: List[Dict[str, str]], settings: Dict[str, Any],
+                      rate_limiter, result_queue) -> Dict[str, Any]:
+    """Worker process entry point for PlaywrightLoopNetScraper.run_sharded"""
+    scraper = PlaywrightLoopNetScraper()
+    for name, value in settings.items():
+        setattr(scraper, name, value)
+    scraper.rate_limiter = rate_limiter
+    scraper.result_queue = result_queue
+    return asyncio.run(scraper.scrape_shard(shard_num, links))
+
+
+def market_name(search_url: str) -> str:
+    """Directory name for a search: the path after /search/, e.g. commercial-real-estate_new-york-ny_for-sale"""
+    parts = [part for part in urlparse(search_url).path.lower().split('/') if part]
+    if 'search' in parts:
+        parts = parts[parts.index('search') + 1:]
+    return re.sub(r'[^a-z0-9_-]+', '-', '_'.join(parts)) or 'market'
+
+
+def load_markets(path: str, default_page_limit: int) -> List[Dict[str, Any]]:
+    """Read a markets file: one "<search url> [page limit] [name]" per line, # for comments"""
+    markets = []
+    names = set()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) > 3 or (len(fields) > 1 and not fields[1].isdigit()):
+                raise ValueError(f"{path}:{line_num}: expected '<search url> [page limit] [name]'")
+            name = fields[2] if len(fields) > 2 else market_name(fields[0])
+            # Keep output directories apart when two searches map to the same name
+            base, n = name, 1
+            while name in names:
+                n += 1
+                name = f"{base}-{n}"
+            names.add(name)
+            markets.append({
+                "search_url": fields[0],
+                "page_limit": int(fields[1]) if len(fields) > 1 else default_page_limit,
+                "name": name,
+            })
+    return markets
+
+
 async def main():
     """Main function to run the scraper"""
     scraper = PlaywrightLoopNetScraper()
@@ -573,22 +1507,55 @@ async def main():
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Fast LoopNet scraper with Playwright")
+    parser.add_argument('search_url', nargs='?', help='LoopNet search results URL')
+    parser.add_argument('page_limit', nargs='?', type=int, help='Number of search results pages to scrape')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue from output/loopnet_checkpoint.jsonl, skipping listings and pages already done')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for detail pages, each with its own browser (default: 1)')
+    parser.add_argument('--revisit-after', type=float, default=7.0, metavar='DAYS',
+                        help='Skip listings scraped by an earlier run less than DAYS ago (0 = rescrape, new ones first)')
+    parser.add_argument('--no-frontier', action='store_true',
+                        help='Ignore output/frontier/ and scrape every gathered listing')
+    parser.add_argument('--no-phones', action='store_true',
+                        help='Skip the phone pass (no reveal clicks); phones only where the listing shows them')
+    parser.add_argument('--no-broker-cache', action='store_true',
+                        help='Ignore output/broker_cache.json and reveal every missing phone')
+    parser.add_argument('--markets', metavar='FILE',
+                        help='Job mode: scrape every "<search url> [page limit] [name]" line of FILE with one browser; '
+                             'results go to output/markets/<name>/')
+    args = parser.parse_args()
+    if args.markets and (args.search_url or args.workers > 1):
+        parser.error('--markets takes no search URL and runs in one process (no --workers)')
     
     print("Starting Fast LoopNet Scraper with Playwright...")
     print("This will open Chrome and scrape property listings with phone numbers concurrently")
     
-    # Set custom search URL and page limit from command line args
-    if len(sys.argv) > 1:
-        scraper = PlaywrightLoopNetScraper()
-        scraper.search_url = sys.argv[1]
-        if len(sys.argv) > 2:
-            scraper.page_limit = int(sys.argv[2])
-        
+    scraper = PlaywrightLoopNetScraper()
+    if args.search_url:
+        scraper.search_url = args.search_url
+    if args.page_limit:
+        scraper.page_limit = args.page_limit
+    scraper.resume = args.resume
+    scraper.shard_workers = args.workers
+    scraper.revisit_after_days = args.revisit_after
+    scraper.use_frontier = not args.no_frontier
+    scraper.phone_enrichment = not args.no_phones
+    scraper.use_broker_cache = not args.no_broker_cache
+    
+    if args.markets:
+        markets = load_markets(args.markets, scraper.page_limit)
+        print(f"Markets: {len(markets)} from {args.markets}")
+        for market in markets:
+            print(f"  {market['name']}: {market['page_limit']} pages of {market['search_url']}")
+        asyncio.run(scraper.run_markets(markets))
+    else:
         print(f"Search URL: {scraper.search_url}")
         print(f"Page limit: {scraper.page_limit}")
+        if scraper.resume:
+            print(f"Resuming from: {scraper.checkpoint.path}")
         
         asyncio.run(scraper.run())
-    else:
-        # Run with default settings
-        asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Bounded pool of reusable Playwright pages
+
+Opening and closing a tab per listing costs a renderer round trip each time
+and churns renderer processes under high concurrency. A PagePool pre-creates
+pages on a context, lends them out, resets them on return (about:blank) and
+replaces each page after max_uses checkouts. Listeners a borrower adds with
+page.on() must be removed by the borrower before it returns the page.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+
+class PagePool:
+    """Pre-created pages that workers check out and return"""
+
+    def __init__(self, context: BrowserContext, size: int, max_uses: int = 25,
+                 setup: Optional[Callable[[Page], Awaitable[None]]] = None):
+        self.context = context
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        # Runs once per new page, e.g. to install request routing
+        self.setup = setup
+
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._uses: Dict[Page, int] = {}
+        self._closed = False
+
+        # Stats
+        self.wait_times: List[float] = []
+        self.recycled = 0
+
+    async def start(self):
+        """Create the pages up front"""
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_page())
+
+    async def _new_page(self) -> Page:
+        page = await self.context.new_page()
+        self._uses[page] = 0
+        if self.setup:
+            await self.setup(page)
+        return page
+
+    async def _discard(self, page: Page):
+        self._uses.pop(page, None)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled page: {str(e)}")
+
+    @asynccontextmanager
+    async def page(self):
+        """Check out a page for the duration of the block"""
+        started = time.monotonic()
+        page = await self._idle.get()
+        self.wait_times.append(time.monotonic() - started)
+        if page is None:
+            # Empty slot left by a failed replacement: open its page now
+            try:
+                page = await self._new_page()
+            except BaseException:
+                self._idle.put_nowait(None)
+                raise
+        try:
+            yield page
+        finally:
+            await self._release(page)
+
+    async def _release(self, page: Page):
+        self._uses[page] = self._uses.get(page, 0) + 1
+        recycle = self._closed or page.is_closed() or self._uses[page] >= self.max_uses
+
+        if not recycle:
+            try:
+                await page.goto("about:blank")
+            except Exception as e:
+                logger.debug(f"Pooled page reset failed, replacing it: {str(e)}")
+                recycle = True
+
+        if recycle:
+            await self._discard(page)
+            if self._closed:
+                return
+            self.recycled += 1
+            try:
+                page = await self._new_page()
+            except Exception as e:
+                # Keep the slot; the next checkout retries and fails there if the browser is gone
+                logger.error(f"Could not replace pooled page: {str(e)}")
+                page = None
+
+        self._idle.put_nowait(page)
+
+    async def close(self):
+        """Close every idle page; pages still checked out are closed when returned"""
+        self._closed = True
+        while not self._idle.empty():
+            page = self._idle.get_nowait()
+            if page is not None:
+                await self._discard(page)
+
+    def stats(self) -> Dict[str, float]:
+        waits = sorted(self.wait_times)
+        count = len(waits)
+        return {
+            "checkouts": count,
+            "mean_wait": sum(waits) / count if count else 0.0,
+            "p95_wait": waits[min(count - 1, int(count * 0.95))] if count else 0.0,
+            "max_wait": waits[-1] if count else 0.0,
+            "recycled": self.recycled,
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        """Log checkout wait times, to size the pool"""
+        s = self.stats()
+        (log or logger).info(
+            f"Page pool ({self.size} pages, recycled every {self.max_uses} uses): {s['checkouts']} checkouts, "
+            f"wait mean {s['mean_wait'] * 1000:.0f} ms / p95 {s['p95_wait'] * 1000:.0f} ms / "
+            f"max {s['max_wait'] * 1000:.0f} ms, {s['recycled']} pages recycled"
+        )
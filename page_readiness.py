@@ -0,0 +1,142 @@
+"""
+Readiness checks for Playwright pages: finish a page as soon as its data exists
+
+Instead of fixed sleeps and networkidle waits, a PageReadiness watches the
+main document response (page.on('response')) and then waits for a per-source
+predicate - by default "the JSON-LD script node is in the DOM" - to hold. Each
+page's readiness time is recorded so the p50/p95/p99 tail can be compared
+across runs.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+from playwright.async_api import Page, Response
+
+logger = logging.getLogger(__name__)
+
+# JS predicates, evaluated in the page until they return true
+READINESS_PREDICATES = {
+    # The listing JSON-LD (or the features section it describes) is parsed
+    'loopnet': """() => document.readyState !== 'loading' && !!(
+        document.querySelector('script[type="application/ld+json"]') ||
+        document.querySelector('section[class*="listing-features"]')
+    )""",
+    # Business JSON-LD or the header block the DOM fallback reads
+    'yellowpages': """() => document.readyState !== 'loading' && !!(
+        document.querySelector('script[type="application/ld+json"]') ||
+        document.querySelector('.mip-header__info, .business-card, .business-info')
+    )""",
+}
+
+DEFAULT_PREDICATE = """() => document.readyState !== 'loading' &&
+    !!document.querySelector('script[type="application/ld+json"]')"""
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ReadinessProbe:
+    """Tracks one navigation of a page; use as a context manager around goto()
+
+    The response listener is removed on exit, so pooled pages don't collect one per checkout.
+    """
+
+    def __init__(self, readiness: "PageReadiness", page: Page):
+        self.readiness = readiness
+        self.page = page
+        self.started = time.monotonic()
+        self.document_at: Optional[float] = None
+        self.document_status: Optional[int] = None
+
+    def _on_response(self, response: Response):
+        request = response.request
+        if request.resource_type == 'document' and response.frame == self.page.main_frame:
+            # The last main-frame document wins (redirects, intermediate pages)
+            self.document_at = time.monotonic()
+            self.document_status = response.status
+
+    def __enter__(self):
+        self.page.on("response", self._on_response)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+    async def wait(self) -> bool:
+        """Wait until the source predicate holds; False on timeout or an error document"""
+        # Error pages never get the data, don't wait for it
+        if self.document_status is not None and self.document_status >= 400:
+            self.readiness.record(self._elapsed(), ready=False)
+            return False
+
+        ready = True
+        try:
+            await self.page.wait_for_function(self.readiness.predicate, polling=self.readiness.polling,
+                                              timeout=self.readiness.timeout * 1000)
+        except Exception as e:
+            logger.debug(f"[{self.readiness.source}] Page not ready: {str(e)}")
+            ready = False
+
+        self.readiness.record(self._elapsed(), ready)
+        return ready
+
+    def _elapsed(self) -> float:
+        # Measured from the document response, so intermediate pages don't count
+        return time.monotonic() - (self.document_at or self.started)
+
+
+class PageReadiness:
+    """Per-source readiness predicate plus readiness-time stats over a run"""
+
+    def __init__(self, source: str, predicate: Optional[str] = None, timeout: float = 15.0, polling: int = 100):
+        self.source = source
+        self.predicate = predicate or READINESS_PREDICATES.get(source, DEFAULT_PREDICATE)
+        self.timeout = timeout  # Seconds before giving up and extracting what is there
+        self.polling = polling  # Predicate polling interval in ms (rAF is throttled in background tabs)
+
+        # Stats
+        self.times: List[float] = []
+        self.timeouts = 0
+
+    @classmethod
+    def for_source(cls, source: str, **overrides) -> "PageReadiness":
+        return cls(source, **overrides)
+
+    def track(self, page: Page) -> ReadinessProbe:
+        """Probe for one navigation; enter it before goto() so the document response is seen"""
+        return ReadinessProbe(self, page)
+
+    def record(self, seconds: float, ready: bool):
+        self.times.append(seconds)
+        if not ready:
+            self.timeouts += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "pages": len(self.times),
+            "not_ready": self.timeouts,
+            "p50": _percentile(self.times, 50),
+            "p95": _percentile(self.times, 95),
+            "p99": _percentile(self.times, 99),
+            "max": max(self.times) if self.times else 0.0,
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        """Log readiness time percentiles for the run"""
+        s = self.stats()
+        if not s["pages"]:
+            return
+        (log or logger).info(
+            f"[{self.source}] Page readiness over {s['pages']} pages: p50 {s['p50']:.2f} s, "
+            f"p95 {s['p95']:.2f} s, p99 {s['p99']:.2f} s, max {s['max']:.2f} s "
+            f"({s['not_ready']} not ready)"
+        )
@@ -0,0 +1,87 @@
+"""
+Async per-host request throttling shared by the scrapers
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class AsyncRateLimiter:
+    """Per-host token bucket that spaces requests without blocking the event loop.
+
+    Requests to a host that has been idle for at least ``min_interval`` go out
+    immediately. Otherwise each caller reserves the next slot, spaced a random
+    ``min_interval``..``max_interval`` seconds after the previous one, and awaits
+    it with ``asyncio.sleep`` so other coroutines keep running meanwhile.
+    ``burst`` lets that many requests through back to back before spacing kicks in.
+    """
+
+    def __init__(self, min_interval: float = 3, max_interval: float = 8, burst: int = 1):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.burst = max(1, burst)
+
+        # Theoretical arrival time of the next request, per host
+        self._next_slot: Dict[str, float] = {}
+
+        # Totals, handy for logging and benchmarks
+        self.total_requests = 0
+        self.total_wait = 0.0
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Bucket key for a URL (its host), or the string itself if it has none"""
+        return urlsplit(url).netloc or url
+
+    def reserve(self, key: str) -> float:
+        """Reserve the next slot for ``key`` and return how long to wait for it"""
+        now = time.monotonic()
+        next_slot = self._next_slot.get(key, now)
+
+        if next_slot <= now:
+            # Host has been idle long enough - go now
+            slot = now
+            self._next_slot[key] = now + self.min_interval
+        else:
+            allowance = (self.burst - 1) * self.min_interval
+            slot = max(now, next_slot - allowance)
+            self._next_slot[key] = next_slot + random.uniform(self.min_interval, self.max_interval)
+
+        delay = slot - now
+        self.total_requests += 1
+        self.total_wait += delay
+        return delay
+
+    async def acquire(self, url: str = "default") -> float:
+        """Wait (without blocking other tasks) until a request to this URL's host may go out"""
+        delay = self.reserve(self.host_key(url))
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class SharedRateLimiter(AsyncRateLimiter):
+    """AsyncRateLimiter whose per-host slots are shared by several processes.
+
+    The slot table and its lock live in a ``multiprocessing.Manager`` owned by
+    the parent, so every worker process reserves from the same per-host budget.
+    ``time.monotonic`` is system-wide, so slot times compare across processes.
+    The limiter pickles with its manager proxies and can be passed to workers.
+    """
+
+    def __init__(self, min_interval: float = 3, max_interval: float = 8, burst: int = 1, slots=None, lock=None):
+        super().__init__(min_interval, max_interval, burst)
+        self._next_slot = slots
+        self._lock = lock
+
+    @classmethod
+    def create(cls, manager, min_interval: float = 3, max_interval: float = 8, burst: int = 1) -> "SharedRateLimiter":
+        """Limiter backed by a started multiprocessing Manager"""
+        return cls(min_interval, max_interval, burst, slots=manager.dict(), lock=manager.Lock())
+
+    def reserve(self, key: str) -> float:
+        with self._lock:
+            return super().reserve(key)
@@ -1,9 +1,13 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import csv
 import time
 import random
+import asyncio
+import re
+
+from http_client import AsyncHttpFetcher, HttpFetcher, format_timing_summary
+from rate_limiter import AsyncRateLimiter
 
 # Cookies and headers from your browser session
 cookies = {
@@ -89,18 +93,125 @@ headers = {
     'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
 }
 
-def scrape_realtor_listings(location, max_pages=1):
+# Opening tag of an embedded JSON script, e.g. <script id="__NEXT_DATA__" type="application/json">
+JSON_SCRIPT_TAG = re.compile(rb'<script\b[^>]*\btype=["\']application/json["\'][^>]*>', re.IGNORECASE)
+
+def extract_embedded_properties(body):
+    """
+    Fast path: slice the embedded page JSON straight out of the response bytes
+    
+    Finds each ``<script type="application/json">`` payload with a regex scan
+    and decodes only the one containing ``"props":``, without building a DOM.
+    
+    Args:
+        body (bytes): Raw page HTML
+    
+    Returns:
+        list: ``props.pageProps.properties``, or None if the page has no such JSON
+    """
+    for tag in JSON_SCRIPT_TAG.finditer(body):
+        start = tag.end()
+        end = body.find(b'</script>', start)
+        if end == -1:
+            break
+        
+        payload = body[start:end]
+        if b'"props":' not in payload:
+            continue
+        
+        try:
+            json_data = json.loads(payload)
+        except ValueError:
+            continue
+        if not isinstance(json_data, dict):
+            continue
+        
+        props = json_data.get('props')
+        page_props = props.get('pageProps') if isinstance(props, dict) else None
+        if not isinstance(page_props, dict):
+            continue
+        if 'properties' in page_props:
+            return page_props['properties']
+    
+    return None
+
+def parse_property_cards(html):
+    """
+    Slow path: parse property cards out of the rendered HTML with BeautifulSoup
+    
+    Args:
+        html (str | bytes): Page HTML
+    
+    Returns:
+        list: List of property dictionaries
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    properties = []
+    
+    for card in soup.select('div[data-testid="property-card"]'):
+        try:
+            # Extract basic property information
+            price_elem = card.select_one('span[data-testid="property-price"]')
+            address_elem = card.select_one('div[data-testid="property-address"]')
+            beds_elem = card.select_one('li[data-testid="property-meta-beds"] span')
+            baths_elem = card.select_one('li[data-testid="property-meta-baths"] span')
+            sqft_elem = card.select_one('li[data-testid="property-meta-sqft"] span')
+            
+            # Create property dictionary
+            property_data = {
+                'price': price_elem.text if price_elem else 'N/A',
+                'address': address_elem.text if address_elem else 'N/A',
+                'beds': beds_elem.text if beds_elem else 'N/A',
+                'baths': baths_elem.text if baths_elem else 'N/A',
+                'sqft': sqft_elem.text if sqft_elem else 'N/A',
+                'url': card.select_one('a')['href'] if card.select_one('a') else None
+            }
+            
+            properties.append(property_data)
+        except Exception as e:
+            print(f"Error parsing property card: {e}")
+    
+    return properties
+
+def parse_realtor_page(body):
+    """
+    Extract property data from one realtor.com search results page
+    
+    Uses the embedded JSON when present and only builds a BeautifulSoup
+    tree for the property-card fallback.
+    
+    Args:
+        body (bytes | str): Page HTML, preferably the raw response bytes
+    
+    Returns:
+        list: List of property dictionaries
+    """
+    raw = body.encode('utf-8') if isinstance(body, str) else body
+    
+    properties = extract_embedded_properties(raw)
+    if not properties:
+        # Alternative method: try to find property cards directly in HTML
+        properties = parse_property_cards(body)
+    
+    return properties
+
+def scrape_realtor_listings(location, max_pages=1, fetcher=None):
     """
     Scrape real estate listings from realtor.com
     
     Args:
         location (str): Location to search for (e.g., 'New-York')
         max_pages (int): Maximum number of pages to scrape
+        fetcher (HttpFetcher): Pooled client to reuse; one is created (and
+            closed) for this call if omitted
     
     Returns:
         list: List of property dictionaries
     """
     all_properties = []
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = HttpFetcher(headers=headers, cookies=cookies)
     
     for page in range(1, max_pages + 1):
         # Construct URL with pagination
@@ -116,60 +227,14 @@ def scrape_realtor_listings(location, max_pages=1):
                 time.sleep(delay)
             
             # Make the request
-            response = requests.get(url, cookies=cookies, headers=headers)
+            response = fetcher.get(url)
             
             # Check if request was successful
             if response.status_code != 200:
                 print(f"Failed to retrieve page {page}. Status code: {response.status_code}")
                 break
-                
-            # Parse the HTML content
-            soup = BeautifulSoup(response.text, 'html.parser')
             
-            # Try to find the property data in the page
-            # Realtor.com often embeds data in JSON scripts
-            script_tags = soup.find_all('script', {'type': 'application/json'})
-            
-            # Extract property data
-            properties = []
-            for script in script_tags:
-                if script.string and '"props":' in script.string:
-                    try:
-                        json_data = json.loads(script.string)
-                        if 'props' in json_data and 'pageProps' in json_data['props']:
-                            page_props = json_data['props']['pageProps']
-                            if 'properties' in page_props:
-                                properties = page_props['properties']
-                                break
-                    except json.JSONDecodeError:
-                        continue
-            
-            if not properties:
-                # Alternative method: try to find property cards directly in HTML
-                property_cards = soup.select('div[data-testid="property-card"]')
-                
-                for card in property_cards:
-                    try:
-                        # Extract basic property information
-                        price_elem = card.select_one('span[data-testid="property-price"]')
-                        address_elem = card.select_one('div[data-testid="property-address"]')
-                        beds_elem = card.select_one('li[data-testid="property-meta-beds"] span')
-                        baths_elem = card.select_one('li[data-testid="property-meta-baths"] span')
-                        sqft_elem = card.select_one('li[data-testid="property-meta-sqft"] span')
-                        
-                        # Create property dictionary
-                        property_data = {
-                            'price': price_elem.text if price_elem else 'N/A',
-                            'address': address_elem.text if address_elem else 'N/A',
-                            'beds': beds_elem.text if beds_elem else 'N/A',
-                            'baths': baths_elem.text if baths_elem else 'N/A',
-                            'sqft': sqft_elem.text if sqft_elem else 'N/A',
-                            'url': card.select_one('a')['href'] if card.select_one('a') else None
-                        }
-                        
-                        properties.append(property_data)
-                    except Exception as e:
-                        print(f"Error parsing property card: {e}")
+            properties = parse_realtor_page(response.content)
             
             # Add properties to overall list
             all_properties.extend(properties)
@@ -182,6 +247,101 @@ def scrape_realtor_listings(location, max_pages=1):
         except Exception as e:
             print(f"Error scraping page {page}: {e}")
     
+    if fetcher.timings:
+        print(format_timing_summary(fetcher.timings))
+    if own_fetcher:
+        fetcher.close()
+    
+    return all_properties
+
+async def scrape_realtor_listings_async(location, max_pages=1, concurrency=1,
+                                        min_interval=3.0, max_interval=7.0, fetcher=None):
+    """
+    Scrape realtor.com search pages concurrently
+    
+    Pages are fetched by up to ``concurrency`` tasks over one pooled client,
+    while an AsyncRateLimiter spaces requests to the host ``min_interval`` to
+    ``max_interval`` seconds apart (the per-host request budget). Results come
+    back in page order. As in the sequential crawler, a non-200 page ends the
+    crawl: requests for later pages are cancelled and only the pages before it
+    are returned.
+    
+    The defaults match the sequential crawler (one page at a time, 3-7 s
+    apart); more concurrency or shorter intervals are opt-in.
+    
+    Args:
+        location (str): Location to search for (e.g., 'New-York')
+        max_pages (int): Maximum number of pages to scrape
+        concurrency (int): Maximum number of pages in flight
+        min_interval (float): Minimum seconds between requests to the host
+        max_interval (float): Maximum seconds between requests to the host
+        fetcher (AsyncHttpFetcher): Pooled client to reuse; one is created (and
+            closed) for this call if omitted
+    
+    Returns:
+        list: List of property dictionaries
+    """
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = AsyncHttpFetcher(headers=headers, cookies=cookies, pool_size=concurrency)
+    
+    limiter = AsyncRateLimiter(min_interval, max_interval)
+    semaphore = asyncio.Semaphore(concurrency)
+    page_results = {}
+    tasks = {}
+    stop_page = max_pages + 1
+    
+    def stop_after(page):
+        # Cancel every request for a page after the one that failed
+        nonlocal stop_page
+        stop_page = min(stop_page, page)
+        for later_page, task in tasks.items():
+            if later_page > page:
+                task.cancel()
+    
+    async def fetch_page(page):
+        url = f'https://www.realtor.com/realestateandhomes-search/{location}/pg-{page}'
+        
+        async with semaphore:
+            await limiter.acquire(url)
+            if page >= stop_page:
+                return
+            
+            try:
+                print(f"Scraping page {page} for {location}...")
+                response = await fetcher.get(url)
+                
+                if response.status_code != 200:
+                    print(f"Failed to retrieve page {page}. Status code: {response.status_code}")
+                    stop_after(page)
+                    return
+                
+                properties = parse_realtor_page(response.content)
+                page_results[page] = properties
+                print(f"Found {len(properties)} properties on page {page}")
+                
+                # Save the HTML (for debugging)
+                with open(f"realtor_{location}_page_{page}.html", "w", encoding="utf-8") as f:
+                    f.write(response.text)
+                    
+            except Exception as e:
+                print(f"Error scraping page {page}: {e}")
+    
+    try:
+        for page in range(1, max_pages + 1):
+            tasks[page] = asyncio.create_task(fetch_page(page))
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    finally:
+        if fetcher.timings:
+            print(format_timing_summary(fetcher.timings))
+        if own_fetcher:
+            await fetcher.close()
+    
+    all_properties = []
+    for page in sorted(page_results):
+        if page < stop_page:
+            all_properties.extend(page_results[page])
+    
     return all_properties
 
 def save_to_csv(properties, filename):
@@ -232,8 +392,14 @@ def main():
     # Number of pages to scrape
     max_pages = 2
     
+    # Number of pages to fetch at once (1 uses the sequential crawler)
+    concurrency = 1
+    
     # Scrape the properties
-    properties = scrape_realtor_listings(location, max_pages)
+    if concurrency > 1:
+        properties = asyncio.run(scrape_realtor_listings_async(location, max_pages, concurrency=concurrency))
+    else:
+        properties = scrape_realtor_listings(location, max_pages)
     
     # Save to CSV
     save_to_json(properties, f"realtor_{location}_listings.json")
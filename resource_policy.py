@@ -0,0 +1,201 @@
+"""
+Request interception for Playwright pages: block resources the scrapers never read
+
+The data we keep comes from JSON-LD and a handful of DOM nodes, so images,
+fonts, video, ads and analytics are pure overhead. A ResourcePolicy installs a
+page.route handler that aborts requests by resource type and domain, and
+counts what each page loaded and skipped.
+"""
+
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import Page, Response, Route
+
+logger = logging.getLogger(__name__)
+
+# Rough transfer size per blocked request, used to estimate bytes saved
+# (an aborted request never reports its real size)
+TYPICAL_RESOURCE_BYTES = {
+    'image': 60_000,
+    'media': 500_000,
+    'font': 40_000,
+    'stylesheet': 30_000,
+    'script': 80_000,
+    'xhr': 5_000,
+    'fetch': 5_000,
+    'document': 50_000,
+    'other': 5_000,
+}
+
+# Ad, analytics and tracking hosts seen on the scraped sites
+TRACKER_DOMAINS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googletagservices.com',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'doubleclick.net',
+    'adservice.google.com',
+    'facebook.net',
+    'connect.facebook.net',
+    'bat.bing.com',
+    'hotjar.com',
+    'newrelic.com',
+    'nr-data.net',
+    'scorecardresearch.com',
+    'quantserve.com',
+    'criteo.com',
+    'criteo.net',
+    'taboola.com',
+    'outbrain.com',
+    'adnxs.com',
+    'amazon-adsystem.com',
+    'moatads.com',
+    'pubmatic.com',
+    'rubiconproject.com',
+    'casalemedia.com',
+    'demdex.net',
+    'omtrdc.net',
+    'clarity.ms',
+    'tiktok.com',
+)
+
+# Per-source rules
+SOURCE_RULES = {
+    # Stylesheets stay so the phone reveal button is laid out and clickable
+    'loopnet': {
+        'block_types': ('image', 'media', 'font'),
+        'block_domains': TRACKER_DOMAINS,
+    },
+    # Intermediate Google/Bing/TripAdvisor visits only need to render, not look right
+    'yellowpages': {
+        'block_types': ('image', 'media', 'font'),
+        'block_domains': TRACKER_DOMAINS,
+    },
+}
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+class PageResourceStats:
+    """What one page loaded and what the policy kept it from loading"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start counting afresh, e.g. when a pooled page is reused for the next listing"""
+        self.allowed_requests = 0
+        self.loaded_bytes = 0
+        self.blocked = Counter()
+
+    @property
+    def blocked_requests(self) -> int:
+        return sum(self.blocked.values())
+
+    @property
+    def estimated_bytes_saved(self) -> int:
+        return sum(TYPICAL_RESOURCE_BYTES.get(kind, TYPICAL_RESOURCE_BYTES['other']) * count
+                   for kind, count in self.blocked.items())
+
+    def record_response(self, response: Response):
+        length = response.headers.get('content-length')
+        if length and length.isdigit():
+            self.loaded_bytes += int(length)
+
+    def summary(self) -> str:
+        return (f"{self.allowed_requests} requests / {self.loaded_bytes / 1024:.0f} KB loaded, "
+                f"{self.blocked_requests} blocked (~{self.estimated_bytes_saved / 1024:.0f} KB saved)")
+
+
+class ResourcePolicy:
+    """Allow/deny rules by resource type and domain, shared by the Playwright scrapers
+
+    Precedence: a host in ``block_domains`` is always blocked, a host in
+    ``allow_domains`` is always allowed, otherwise the request is blocked if its
+    resource type is in ``block_types``.
+    """
+
+    def __init__(self, source: str, block_types: Iterable[str] = (), block_domains: Iterable[str] = (),
+                 allow_domains: Iterable[str] = ()):
+        self.source = source
+        self.block_types = frozenset(block_types)
+        self.block_domains = tuple(block_domains)
+        self.allow_domains = tuple(allow_domains)
+
+        # Totals over every page this policy was installed on
+        self.pages = 0
+        self.allowed_requests = 0
+        self.loaded_bytes = 0
+        self.blocked = Counter()
+
+    @classmethod
+    def for_source(cls, source: str, **overrides) -> "ResourcePolicy":
+        """Policy with the preset rules for a source ('loopnet', 'yellowpages'), optionally overridden"""
+        rules = dict(SOURCE_RULES.get(source, {}))
+        rules.update(overrides)
+        return cls(source, **rules)
+
+    def allows(self, resource_type: str, url: str) -> bool:
+        """Whether a request should go through"""
+        host = urlsplit(url).hostname or ''
+        if _host_matches(host, self.block_domains):
+            return False
+        if self.allow_domains and _host_matches(host, self.allow_domains):
+            return True
+        return resource_type not in self.block_types
+
+    async def install(self, page: Page) -> PageResourceStats:
+        """Route every request of the page through this policy; returns the page's live stats"""
+        stats = PageResourceStats()
+
+        async def handle(route: Route):
+            request = route.request
+            if self.allows(request.resource_type, request.url):
+                stats.allowed_requests += 1
+                await route.continue_()
+            else:
+                stats.blocked[request.resource_type] += 1
+                await route.abort()
+
+        await page.route("**/*", handle)
+        page.on("response", stats.record_response)
+        return stats
+
+    def add_page(self, stats: PageResourceStats):
+        """Fold one finished page's stats into the run totals"""
+        self.pages += 1
+        self.allowed_requests += stats.allowed_requests
+        self.loaded_bytes += stats.loaded_bytes
+        self.blocked.update(stats.blocked)
+
+    def totals(self) -> Dict[str, float]:
+        saved = sum(TYPICAL_RESOURCE_BYTES.get(kind, TYPICAL_RESOURCE_BYTES['other']) * count
+                    for kind, count in self.blocked.items())
+        pages = max(self.pages, 1)
+        return {
+            "pages": self.pages,
+            "blocked_requests": sum(self.blocked.values()),
+            "blocked_requests_per_page": sum(self.blocked.values()) / pages,
+            "estimated_bytes_saved": saved,
+            "estimated_bytes_saved_per_page": saved / pages,
+            "loaded_bytes_per_page": self.loaded_bytes / pages,
+        }
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        """Log run totals: requests and bytes saved per page, by resource type"""
+        log = log or logger
+        t = self.totals()
+        if not t["pages"]:
+            return
+        by_type = ', '.join(f"{kind} {count}" for kind, count in self.blocked.most_common())
+        log.info(f"[{self.source}] Resource blocking over {t['pages']} pages: "
+                 f"{t['blocked_requests_per_page']:.1f} requests and ~{t['estimated_bytes_saved_per_page'] / 1024:.0f} KB "
+                 f"saved per page ({t['loaded_bytes_per_page'] / 1024:.0f} KB still loaded per page)")
+        if by_type:
+            log.info(f"[{self.source}] Blocked by type: {by_type}")
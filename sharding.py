@@ -0,0 +1,64 @@
+"""
+Run a scraper's detail phase in several worker processes
+
+The parent splits the listing frontier into shards and starts one process per
+shard, each with its own browser and concurrency limit. All workers draw from
+one SharedRateLimiter, so the per-host request budget stays global. Workers
+stream finished records back over a queue and the parent merges them as they
+arrive.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Sequence
+
+from rate_limiter import SharedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def split_shards(items: Sequence[Any], count: int) -> List[List[Any]]:
+    """Round-robin split, so each shard gets a similar mix of early and late listings"""
+    count = max(1, min(count, len(items)))
+    return [list(items[i::count]) for i in range(count)]
+
+
+async def run_shards(worker: Callable, shards: List[List[Any]], settings: Dict[str, Any],
+                     min_interval: float, max_interval: float,
+                     on_record: Callable[[Dict[str, Any]], None]) -> List[Any]:
+    """Run ``worker(shard_num, items, settings, rate_limiter, result_queue)`` in one process per shard
+
+    ``worker`` must be a module-level function (processes are spawned). Every
+    record a worker puts on ``result_queue`` is passed to ``on_record`` in this
+    process. Returns each worker's return value, or the exception it raised.
+    """
+    # Spawn, not fork: the parent has a running event loop and Playwright threads
+    context = multiprocessing.get_context("spawn")
+    loop = asyncio.get_running_loop()
+
+    with context.Manager() as manager:
+        rate_limiter = SharedRateLimiter.create(manager, min_interval, max_interval)
+        result_queue = manager.Queue()
+
+        with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+            futures = [
+                loop.run_in_executor(pool, worker, shard_num, shard, settings, rate_limiter, result_queue)
+                for shard_num, shard in enumerate(shards, 1)
+            ]
+            logger.info(f"Started {len(shards)} worker processes for {sum(len(s) for s in shards)} items")
+
+            # Merge records as they arrive; done once every worker has exited and the queue is drained
+            while True:
+                try:
+                    record = await loop.run_in_executor(None, partial(result_queue.get, timeout=0.5))
+                except queue.Empty:
+                    if all(future.done() for future in futures):
+                        break
+                    continue
+                on_record(record)
+
+            return await asyncio.gather(*futures, return_exceptions=True)
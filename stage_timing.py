@@ -0,0 +1,169 @@
+"""
+Per-stage latency histograms for the Playwright scrapers
+
+A StageTimer holds one LatencyHistogram per named stage (goto, readiness,
+scrolling, sleeps, ...) for a source. Histograms are HDR-style: values fall
+into logarithmic buckets with ~1% relative error, so memory stays constant
+however many samples are recorded and histograms from several processes can
+be merged. At the end of a run the timer logs a summary table and writes the
+same data as JSON.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import math
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bucket width as a ratio: each bucket covers [base**k, base**(k+1))
+BUCKET_BASE = 1.02
+MIN_SECONDS = 1e-6
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in seconds"""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        seconds = max(seconds, MIN_SECONDS)
+        key = int(math.log(seconds / MIN_SECONDS, BUCKET_BASE))
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Value at a percentile (bucket midpoint, clamped to the observed min/max)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen >= rank:
+                value = MIN_SECONDS * BUCKET_BASE ** (key + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram"):
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max,
+            "bucket_base": BUCKET_BASE,
+            "buckets": {str(key): count for key, count in sorted(self.buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.buckets = {int(key): count for key, count in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"] if data["count"] else math.inf
+        histogram.max = data["max"]
+        return histogram
+
+
+class StageTimer:
+    """Latency histograms per stage for one source"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, stage: str, seconds: float):
+        if stage not in self.histograms:
+            self.histograms[stage] = LatencyHistogram()
+        self.histograms[stage].record(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time the enclosed block (awaits included) as one sample of ``stage``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    async def sleep(self, stage: str, seconds: float):
+        """asyncio.sleep recorded under ``stage``, so deliberate pauses show up next to real work"""
+        with self.time(stage):
+            await asyncio.sleep(seconds)
+
+    def merge(self, data: Dict[str, Any]):
+        """Fold in another timer's to_dict() output, e.g. from a worker process"""
+        for stage, histogram in data.get("stages", {}).items():
+            if stage not in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+            self.histograms[stage].merge(LatencyHistogram.from_dict(histogram))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "stages": {stage: h.to_dict() for stage, h in sorted(self.histograms.items())},
+        }
+
+    def summary_table(self) -> str:
+        """Stages sorted by total time, with count and percentiles in seconds (nested stages overlap)"""
+        rows = sorted(self.histograms.items(), key=lambda item: item[1].total, reverse=True)
+        lines = [f"{'stage':<28}{'count':>7}{'total':>10}{'mean':>8}"
+                 f"{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}"]
+        for stage, h in rows:
+            lines.append(f"{stage:<28}{h.count:>7}{h.total:>10.1f}{h.mean:>8.2f}"
+                         f"{h.percentile(50):>8.2f}{h.percentile(90):>8.2f}{h.percentile(99):>8.2f}{h.max:>8.2f}")
+        return '\n'.join(lines)
+
+    def log_summary(self, log: Optional[logging.Logger] = None):
+        if not self.histograms:
+            return
+        (log or logger).info(f"[{self.source}] Stage timings (seconds):\n{self.summary_table()}")
+
+    def dump_json(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def timed_stage(stage: str):
+    """Decorator for async scraper methods: record each call under ``stage`` in ``self.stages``"""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            with self.stages.time(stage):
+                return await method(self, *args, **kwargs)
+        return wrapper
+    return decorator
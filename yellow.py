@@ -2,15 +2,25 @@ import asyncio
 import json
 import csv
 import random
+import time
 from datetime import datetime
 from pathlib import Path
 import logging
 from typing import Dict, List, Any, Optional
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-import time
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import string
 import re
 
+from rate_limiter import AsyncRateLimiter
+from adaptive_concurrency import AIMDConcurrency
+from browser_governor import BrowserGovernor
+from frontier import URLFrontier, dedupe_links
+from page_readiness import PageReadiness, ReadinessProbe
+from resource_policy import ResourcePolicy
+from sharding import run_shards, split_shards
+from stage_timing import StageTimer, timed_stage
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,13 +41,23 @@ class EnhancedYellowPagesScraper:
         self.page_limit = page_limit
         self.links_per_agent = 1
         self.search_page_delay = random.randint(5, 10)  # Randomized delay
-        self.batch_size = 8
+        self.batch_size = 8  # Upper bound on concurrent batches
+        self.adaptive_concurrency = True  # Let an AIMD controller pick the concurrency, up to batch_size
+        self.initial_concurrency = 2  # Starting point for the controller
+        self.target_latency = 60.0  # Mean seconds per batch (pauses included) under which it keeps growing
+        self.concurrency = None
         self.timeout = 90000
         
         # Path setup
         self.output_dir = Path("yellowpages_data")
         self.output_dir.mkdir(exist_ok=True)
         
+        # Listings seen by earlier runs (yellowpages_data/frontier/): new ones are scraped first, ones
+        # scraped less than revisit_after_days ago are skipped (None = never skip, only reorder)
+        self.use_frontier = True
+        self.revisit_after_days = 7.0
+        self.frontier = URLFrontier(self.output_dir / "frontier")
+        
         # Data stores
         self.listing_urls = []
         self.results = []
@@ -62,11 +82,33 @@ class EnhancedYellowPagesScraper:
         ]
         
         self.browser = None
+        self.playwright = None
+        
+        # Relaunch the browser between batches after this many contexts (one per batch or
+        # search page), or once Chromium's RSS passes the ceiling (None = no limit)
+        self.recycle_after_pages = 200
+        self.max_browser_rss_mb = 2048
+        self.governor = None
         
         # Request throttling
         self.min_request_interval = 3  # Minimum seconds between requests
         self.max_request_interval = 8  # Maximum seconds between requests
-        self.last_request_time = 0
+        self.rate_limiter = AsyncRateLimiter(self.min_request_interval, self.max_request_interval)
+        
+        # Sharded mode: listings are split across worker processes, each with its own browser,
+        # all drawing from one rate limiter budget
+        self.shard_workers = 1  # Worker processes (1 = everything in this process)
+        self.shard_batch_size = 4  # Concurrent listing batches per worker
+        self.result_queue = None  # Set in worker processes: records go to the parent process
+        
+        # Block images, fonts, media and trackers on listing pages (None loads everything)
+        self.resource_policy = ResourcePolicy.for_source("yellowpages")
+        
+        # Listing pages are extracted as soon as the business data is in the DOM
+        self.readiness = PageReadiness.for_source("yellowpages", timeout=15.0)
+        
+        # Latency histogram per stage (navigation, scrolling, extraction, pauses...)
+        self.stages = StageTimer("yellowpages")
 
     async def scrape_more_info_section(self, page: Page) -> Dict:
         """Scrape the detailed 'More Info' section with enhanced deduplication"""
@@ -428,6 +470,7 @@ class EnhancedYellowPagesScraper:
             
         return result
         
+    @timed_stage("scrape_additional_details")
     async def scrape_additional_details(self, page: Page) -> Dict:
         """Scrape additional details that might be available but not in structured data"""
         result = {}
@@ -546,39 +589,64 @@ class EnhancedYellowPagesScraper:
             
         return result
 
+    async def launch_browser(self, p):
+        """Launch Chromium with the stealth flags"""
+        self.playwright = p
+        # Configure browser launch with enhanced stealth
+        self.browser = await p.chromium.launch(
+            headless=True,  # Set to True for production
+            args=[
+                '--disable-blink-features=AutomationControlled',
+                '--start-maximized',
+                '--disable-extensions',
+                '--disable-popup-blocking',
+                '--disable-infobars',
+                '--disable-dev-shm-usage',
+                '--no-sandbox',
+                '--disable-setuid-sandbox',
+                '--disable-accelerated-2d-canvas',
+                '--no-first-run',
+                '--no-default-browser-check',
+                '--disable-gpu',
+                '--disable-notifications',
+                '--disable-background-timer-throttling',
+                '--disable-backgrounding-occluded-windows',
+                '--disable-breakpad',
+                '--disable-component-extensions-with-background-pages',
+                '--disable-features=TranslateUI,BlinkGenPropertyTrees',
+                '--disable-ipc-flooding-protection',
+                '--disable-renderer-backgrounding',
+                '--mute-audio',
+                '--hide-scrollbars',
+            ],
+            slow_mo=random.randint(50, 150)  # More moderate slowdown
+        )
+        if self.governor is None:
+            self.governor = BrowserGovernor(self.restart_browser, self.recycle_after_pages,
+                                            self.max_browser_rss_mb, name="yellowpages")
+        self.governor.attach(self.browser)
+
+    async def restart_browser(self):
+        """Governor callback, run with no batch in flight: close the browser and launch a fresh one"""
+        try:
+            await self.browser.close()
+        except Exception as e:
+            logger.debug(f"Closing the old browser failed: {str(e)}")
+        await self.launch_browser(self.playwright)
+
     async def run(self):
         """Execute the scraping workflow"""
+        self.open_frontier()
+        if self.shard_workers > 1:
+            try:
+                await self.run_sharded()
+            finally:
+                self.close_frontier()
+            return
+        
         try:
             async with async_playwright() as p:
-                # Configure browser launch with enhanced stealth
-                self.browser = await p.chromium.launch(
-                    headless=True,  # Set to True for production
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--start-maximized',
-                        '--disable-extensions',
-                        '--disable-popup-blocking',
-                        '--disable-infobars',
-                        '--disable-dev-shm-usage',
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-accelerated-2d-canvas',
-                        '--no-first-run',
-                        '--no-default-browser-check',
-                        '--disable-gpu',
-                        '--disable-notifications',
-                        '--disable-background-timer-throttling',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-breakpad',
-                        '--disable-component-extensions-with-background-pages',
-                        '--disable-features=TranslateUI,BlinkGenPropertyTrees',
-                        '--disable-ipc-flooding-protection',
-                        '--disable-renderer-backgrounding',
-                        '--mute-audio',
-                        '--hide-scrollbars',
-                    ],
-                    slow_mo=random.randint(50, 150)  # More moderate slowdown
-                )
+                await self.launch_browser(p)
                 
                 # Execute scraping steps
                 await self.gather_listing_urls()
@@ -589,80 +657,182 @@ class EnhancedYellowPagesScraper:
                 else:
                     logger.error("No listings collected - check selectors")
                 
+                if self.resource_policy:
+                    self.resource_policy.log_summary(logger)
+                self.readiness.log_summary(logger)
+                self.governor.log_summary(logger)
+                
                 self.save_results()
+                self.save_stage_timings()
+                self.close_frontier()
                 await self.browser.close()
         
         except Exception as e:
             logger.critical(f"Scraping failed: {str(e)}")
+            self.close_frontier()
             if self.browser:
                 await self.browser.close()
             raise
 
-    def throttle_request(self):
-        """Implement request throttling with variable delays"""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
-        
-        if elapsed < self.min_request_interval:
-            delay = self.min_request_interval + random.uniform(0, self.max_request_interval - self.min_request_interval)
-            time.sleep(delay)
-            
-        self.last_request_time = time.time()
+    async def run_sharded(self):
+        """Gather listings in this process, then scrape them in shard_workers processes
+        
+        Each worker has its own browser and shard_batch_size concurrent
+        batches; all of them share one per-host budget of min/max_request_interval
+        seconds between requests. Records are merged here as they arrive.
+        """
+        started = time.monotonic()
+        async with async_playwright() as p:
+            await self.launch_browser(p)
+            try:
+                await self.gather_listing_urls()
+            finally:
+                await self.browser.close()
+                self.browser = None
+        
+        if not self.listing_urls:
+            logger.error("No listings collected - check selectors")
+            return
+        
+        shards = split_shards(self.listing_urls, self.shard_workers)
+        logger.info(f"Scraping {len(self.listing_urls)} listings in {len(shards)} worker processes")
+        settings = {"batch_size": self.shard_batch_size, "links_per_agent": self.links_per_agent}
+        shard_stats = await run_shards(run_yellowpages_shard, shards, settings,
+                                       self.min_request_interval, self.max_request_interval,
+                                       on_record=self.add_result)
+        for stats in shard_stats:
+            if isinstance(stats, Exception):
+                logger.error(f"Worker process failed: {str(stats)}")
+            else:
+                logger.info(f"[shard {stats['shard']}] {stats['scraped']}/{stats['listings']} listings in "
+                            f"{stats['seconds']:.1f} s ({stats['throttle_wait']:.1f} s waiting for the request budget)")
+                self.stages.merge(stats["stage_timings"])
+        
+        elapsed = time.monotonic() - started
+        logger.info(f"Scraping took {elapsed:.1f} seconds ({len(self.results) / max(elapsed, 1e-9) * 60:.1f} listings/min)")
+        self.save_results()
+        self.save_stage_timings()
+    
+    async def scrape_shard(self, shard_num: int, links: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Worker side of run_sharded: scrape one shard of listings with this process's own browser"""
+        started = time.monotonic()
+        async with async_playwright() as p:
+            await self.launch_browser(p)
+            try:
+                self.listing_urls = links
+                await self.scrape_restaurant_listings()
+                if self.resource_policy:
+                    self.resource_policy.log_summary(logger)
+                self.readiness.log_summary(logger)
+                self.governor.log_summary(logger)
+            finally:
+                await self.browser.close()
+        
+        return {
+            "shard": shard_num,
+            "listings": len(links),
+            "scraped": len(self.results),
+            "seconds": time.monotonic() - started,
+            "throttle_wait": self.rate_limiter.total_wait,
+            "stage_timings": self.stages.to_dict(),
+        }
+    
+    def add_result(self, data: Dict[str, Any]):
+        """Keep a scraped record, and pass it to the parent process in a sharded worker"""
+        self.results.append(data)
+        if self.result_queue is not None:
+            self.result_queue.put(data)
+        elif self.frontier.is_open and data.get('listing_url') and not data.get('scrape_error'):
+            self.frontier.mark_scraped(data['listing_url'])
+
+    def open_frontier(self):
+        if self.use_frontier:
+            self.frontier.revisit_after = None if self.revisit_after_days is None else self.revisit_after_days * 86400
+            self.frontier.open()
+
+    def close_frontier(self):
+        if self.frontier.is_open:
+            self.frontier.log_summary(logger)
+            self.frontier.close()
+
+    @timed_stage("throttle_wait")
+    async def throttle_request(self, url: str):
+        """Wait for this URL's host slot in the shared rate limiter without blocking other tasks"""
+        delay = await self.rate_limiter.acquire(url)
+        if delay > 0:
+            logger.debug(f"Throttled {delay:.2f} seconds before {url}")
 
     async def gather_listing_urls(self):
         """Collect listing URLs from search pages"""
         for page_num in range(1, self.page_limit + 1):
             try:
-                # Throttle requests
-                self.throttle_request()
-                
-                # Get browser context with rotating UA and optional proxy
-                context = await self.get_stealth_context()
-                
-                page = await context.new_page()
+                url = f"{self.search_url}?page={page_num}" if page_num > 1 else self.search_url
                 
-                try:
-                    # Apply browser fingerprint evasion
-                    await self.apply_stealth_techniques(page)
-                    
-                    url = f"{self.search_url}?page={page_num}" if page_num > 1 else self.search_url
-                    logger.info(f"Processing page {page_num}...")
-                    
-                    # More human-like navigation pattern
-                    await self.human_like_navigation(page, url, page_num)
-                    
-                    # Wait for the exact results container
-                    await self.wait_for_results_container(page)
-                    
-                    # Human-like scrolling before extraction
-                    await self.human_like_scrolling(page)
-                    
-                    # Extract links with precise targeting
-                    links = await self.extract_links_with_precision(page, page_num)
-                    
-                    if links:
-                        self.listing_urls.extend(links)
-                        logger.info(f"Extracted {len(links)} links from page {page_num}")
-                    else:
-                        logger.warning(f"No links found on page {page_num}")
-                        await self.debug_page(page, f"no_links_page_{page_num}")
-                    
-                    # Variable delay between pages
-                    if page_num < self.page_limit:
-                        delay = random.uniform(self.search_page_delay, self.search_page_delay + 5)
-                        logger.info(f"Waiting {delay:.2f} seconds before next page...")
-                        await asyncio.sleep(delay)
+                # Throttle requests
+                await self.throttle_request(url)
                 
-                finally:
-                    await page.close()
-                    await context.close()
+                async with self.governor.slot():
+                    # Get browser context with rotating UA and optional proxy
+                    context = await self.get_stealth_context()
+
+                    page = await context.new_page()
+
+                    try:
+                        # Apply browser fingerprint evasion
+                        await self.apply_stealth_techniques(page)
+
+                        logger.info(f"Processing page {page_num}...")
+
+                        # More human-like navigation pattern
+                        await self.human_like_navigation(page, url, page_num)
+
+                        # Wait for the exact results container
+                        await self.wait_for_results_container(page)
+
+                        # Human-like scrolling before extraction
+                        await self.human_like_scrolling(page)
+
+                        # Extract links with precise targeting
+                        links = await self.extract_links_with_precision(page, page_num)
+
+                        if links:
+                            self.listing_urls.extend(links)
+                            logger.info(f"Extracted {len(links)} links from page {page_num}")
+                        else:
+                            logger.warning(f"No links found on page {page_num}")
+                            await self.debug_page(page, f"no_links_page_{page_num}")
+
+                        # Variable delay between pages
+                        if page_num < self.page_limit:
+                            delay = random.uniform(self.search_page_delay, self.search_page_delay + 5)
+                            logger.info(f"Waiting {delay:.2f} seconds before next page...")
+                            await self.stages.sleep("search_page_delay", delay)
+
+                    finally:
+                        await page.close()
+                        await context.close()
             
             except Exception as e:
                 logger.error(f"Page {page_num} failed: {str(e)}")
                 # Wait longer after an error
-                await asyncio.sleep(10 + random.random() * 5)
+                await self.stages.sleep("error_backoff", 10 + random.random() * 5)
                 continue
+        
+        # The same business shows up on several pages and in every run: drop repeats, then skip
+        # or defer what earlier runs scraped. Shuffle within each group so the access pattern
+        # stays unpredictable while new listings still go first.
+        if self.use_frontier:
+            new, revisits = self.frontier.plan(self.listing_urls)
+        else:
+            new, revisits = dedupe_links(self.listing_urls), []
+        random.shuffle(new)
+        random.shuffle(revisits)
+        if len(new) + len(revisits) < len(self.listing_urls):
+            logger.info(f"Skipping {len(self.listing_urls) - len(new) - len(revisits)} of {len(self.listing_urls)} "
+                        f"gathered listings (duplicates or scraped recently)")
+        self.listing_urls = new + revisits
 
+    @timed_stage("new_context")
     async def get_stealth_context(self) -> BrowserContext:
         """Create a new browser context with anti-detection measures"""
         user_agent = random.choice(self.user_agents)
@@ -692,7 +862,7 @@ class EnhancedYellowPagesScraper:
             proxy = random.choice(self.proxies)
             context_options["proxy"] = {"server": proxy}
         
-        return await self.browser.new_context(**context_options)
+        return self.governor.track_context(await self.browser.new_context(**context_options))
 
     async def apply_stealth_techniques(self, page: Page):
         """Apply various stealth techniques to the page"""
@@ -763,8 +933,9 @@ class EnhancedYellowPagesScraper:
         }
         """)
 
-    async def human_like_navigation(self, page: Page, url: str, page_num: int):
-        """Navigate with a more human-like pattern"""
+    async def human_like_navigation(self, page: Page, url: str, page_num: int,
+                                    probe: Optional[ReadinessProbe] = None) -> Optional[bool]:
+        """Navigate with a more human-like pattern; with a readiness probe, returns whether the data showed up"""
         max_attempts = 3
         for attempt in range(1, max_attempts + 1):
             try:
@@ -780,49 +951,60 @@ class EnhancedYellowPagesScraper:
                     intermediate_site = random.choice(intermediate_sites)
                     logger.info(f"Visiting intermediate site: {intermediate_site}")
                     
-                    await page.goto(
-                        intermediate_site,
-                        wait_until="domcontentloaded",
-                        timeout=self.timeout
-                    )
+                    with self.stages.time("goto_intermediate"):
+                        await page.goto(
+                            intermediate_site,
+                            wait_until="domcontentloaded",
+                            timeout=self.timeout
+                        )
                     
                     # Do some random scrolling
                     await self.human_like_scrolling(page, scroll_count=random.randint(1, 3))
                     
                     # Wait with random time after visiting intermediate site
-                    await asyncio.sleep(2 + random.random() * 2)
+                    await self.stages.sleep("intermediate_pause", 2 + random.random() * 2)
                 
                 # Main navigation to target URL
                 logger.info(f"Navigating to target URL: {url}")
-                await page.goto(
-                    url,
-                    wait_until="domcontentloaded",
-                    timeout=self.timeout
-                )
+                with self.stages.time("goto"):
+                    await page.goto(
+                        url,
+                        wait_until="domcontentloaded",
+                        timeout=self.timeout
+                    )
+                
+                # Before the pause, so readiness times measure the page and not the sleep
+                ready = None
+                if probe is not None:
+                    with self.stages.time("readiness_wait"):
+                        ready = await probe.wait()
                 
-                await asyncio.sleep(2 + random.random() * 2)
+                await self.stages.sleep("navigation_pause", 2 + random.random() * 2)
                 
                 # Perform random mouse movements
                 await self.random_mouse_movements(page)
                 
                 # Check for blocks or captchas
                 if await self.detect_blocking(page):
+                    if self.concurrency:
+                        self.concurrency.overload("block detected")
                     if attempt < max_attempts:
                         logger.warning(f"Block detected, attempt {attempt}/{max_attempts}. Waiting before retry...")
                         # Longer wait after block detection
-                        await asyncio.sleep(10 + attempt * 5 + random.random() * 10)
+                        await self.stages.sleep("block_backoff", 10 + attempt * 5 + random.random() * 10)
                         continue
                     else:
                         raise Exception("Site blocked access after multiple attempts")
                 
-                return
+                return ready
             
             except Exception as e:
                 if attempt == max_attempts:
                     raise
                 logger.warning(f"Navigation attempt {attempt} failed, retrying: {str(e)}")
-                await asyncio.sleep(5 * attempt + random.random() * 5)
+                await self.stages.sleep("retry_backoff", 5 * attempt + random.random() * 5)
 
+    @timed_stage("detect_blocking")
     async def detect_blocking(self, page: Page) -> bool:
         """Detect if the site is blocking us"""
         block_indicators = [
@@ -859,6 +1041,7 @@ class EnhancedYellowPagesScraper:
             
         return False
 
+    @timed_stage("random_mouse_movements")
     async def random_mouse_movements(self, page: Page):
         """Perform random mouse movements to mimic human behavior"""
         width = await page.evaluate('window.innerWidth')
@@ -889,6 +1072,7 @@ class EnhancedYellowPagesScraper:
             await asyncio.sleep(random.random() * 0.1)
             await page.mouse.up()
 
+    @timed_stage("human_like_scrolling")
     async def human_like_scrolling(self, page: Page, scroll_count=None):
         """Simulate human-like scrolling behavior"""
         if scroll_count is None:
@@ -922,6 +1106,7 @@ class EnhancedYellowPagesScraper:
                 await page.evaluate(f'window.scrollBy(0, {wiggle})')
                 await asyncio.sleep(random.uniform(0.3, 0.7))
 
+    @timed_stage("wait_for_results_container")
     async def wait_for_results_container(self, page: Page):
         """Precisely wait for the correct results container"""
         container_selector = 'div.search-results.organic:not(.center-ads)'
@@ -1004,9 +1189,7 @@ class EnhancedYellowPagesScraper:
 
     async def scrape_restaurant_listings(self):
         """Scrape listings with batched concurrency and delay distribution"""
-        # Randomly shuffle the listing URLs to make the access pattern less predictable
-        random.shuffle(self.listing_urls)
-        
+        # gather_listing_urls already shuffled the order (new listings first)
         link_batches = [
             self.listing_urls[i:i + self.links_per_agent] 
             for i in range(0, len(self.listing_urls), self.links_per_agent)
@@ -1014,12 +1197,18 @@ class EnhancedYellowPagesScraper:
         
         # Use a smaller batch size for more randomness in access patterns
         reduced_batch_size = max(1, min(self.batch_size, len(link_batches) // 2))
-        semaphore = asyncio.Semaphore(reduced_batch_size)
+        if self.adaptive_concurrency:
+            # Start low and let timeouts/blocks vs. healthy latency move the limit
+            self.concurrency = AIMDConcurrency(initial=min(self.initial_concurrency, reduced_batch_size), max_limit=reduced_batch_size,
+                                               target_latency=self.target_latency, name="yellowpages")
+            semaphore = self.concurrency
+        else:
+            semaphore = asyncio.Semaphore(reduced_batch_size)
         tasks = []
         
         for batch_num, batch_links in enumerate(link_batches, 1):
             # Add jitter to task scheduling
-            await asyncio.sleep(random.random() * 2)
+            await self.stages.sleep("schedule_jitter", random.random() * 2)
             task = self.process_batch(batch_links, batch_num, semaphore)
             tasks.append(task)
         
@@ -1030,72 +1219,66 @@ class EnhancedYellowPagesScraper:
         for result in results:
             if isinstance(result, Exception):
                 logger.error(f"Batch processing error: {str(result)}")
+        
+        if self.concurrency:
+            self.concurrency.log_summary(logger)
 
-    async def process_batch(self, links_batch: List[Dict[str, str]], batch_num: int, semaphore: asyncio.Semaphore):
+    async def process_batch(self, links_batch: List[Dict[str, str]], batch_num: int, semaphore):
         """Process a batch of links with fresh context"""
         async with semaphore:
-            # Add jitter to batch processing
-            await asyncio.sleep(random.uniform(1, 5))
-            
-            # Create a new context for each batch
-            context = await self.get_stealth_context()
-            
-            try:
-                # Randomize the sequence within the batch
-                random.shuffle(links_batch)
-                
-                for link_num, link in enumerate(links_batch, 1):
-                    try:
-                        self.throttle_request()
-                        await self.scrape_single_listing(context, link, batch_num, link_num)
-                        
-                        # Variable delay between listings
-                        delay = random.uniform(3, 8)
-                        logger.info(f"Waiting {delay:.2f} seconds before next listing...")
-                        await asyncio.sleep(delay)
-                    except Exception as e:
-                        logger.error(f"Batch {batch_num}-{link_num} failed: {str(e)}")
-                        # Longer wait after an error
-                        await asyncio.sleep(5 + random.random() * 10)
-                        continue
-            finally:
-                await context.close()
+            # The browser may be recycled between batches, never during one
+            async with self.governor.slot():
+                # Add jitter to batch processing
+                await self.stages.sleep("batch_jitter", random.uniform(1, 5))
+
+                # Create a new context for each batch
+                context = await self.get_stealth_context()
+
+                try:
+                    # Randomize the sequence within the batch
+                    random.shuffle(links_batch)
+
+                    for link_num, link in enumerate(links_batch, 1):
+                        try:
+                            await self.throttle_request(link['url'])
+                            await self.scrape_single_listing(context, link, batch_num, link_num)
+
+                            # Variable delay between listings
+                            delay = random.uniform(3, 8)
+                            logger.info(f"Waiting {delay:.2f} seconds before next listing...")
+                            await self.stages.sleep("listing_delay", delay)
+                        except Exception as e:
+                            logger.error(f"Batch {batch_num}-{link_num} failed: {str(e)}")
+                            # Longer wait after an error
+                            await self.stages.sleep("error_backoff", 5 + random.random() * 10)
+                            continue
+                finally:
+                    await context.close()
 
+    @timed_stage("listing_total")
     async def scrape_single_listing(self, context: BrowserContext, link: Dict[str, str], batch_num: int, link_num: int):
         """Scrape individual listing page with improved reliability"""
         page = await context.new_page()
+        resource_stats = None
         
         try:
             # Apply stealth techniques to each page
             await self.apply_stealth_techniques(page)
             
-            logger.info(f"[Batch {batch_num}-{link_num}] Processing: {link['title'][:50]}...")
-            
-            # Use human-like navigation
-            await self.human_like_navigation(page, link['url'], 0)
+            if self.resource_policy:
+                resource_stats = await self.resource_policy.install(page)
             
-            # Wait with random timing
-            await asyncio.sleep(1 + random.random() * 2)
-            
-            # Wait for content to load
-            try:
-                # Try multiple possible selectors for key content elements
-                await page.wait_for_selector([
-                    '.business-card', 
-                    '.mip-header__info',
-                    'script[type="application/ld+json"]',
-                    '.business-info',
-                    'h1',
-                    '.address',
-                    '.phone',
-                    '.contact-info'
-                ].join(', '), timeout=20000, state='attached')
-            except Exception as e:
-                logger.warning(f"Could not find primary selectors, but continuing: {str(e)}")
-                # Continue anyway - we'll extract what we can
+            logger.info(f"[Batch {batch_num}-{link_num}] Processing: {link['title'][:50]}...")
             
-            # Wait for the page to be fully loaded
-            await page.wait_for_load_state('networkidle', timeout=15000)
+            # Use human-like navigation, then wait until the business data is in the DOM
+            with self.readiness.track(page) as probe:
+                ready = await self.human_like_navigation(page, link['url'], 0, probe)
+                if not ready:
+                    logger.warning(f"[Batch {batch_num}-{link_num}] Listing data not found, but continuing")
+                    if self.concurrency:
+                        self.concurrency.mark_failed("not ready")
+                    # Continue anyway - we'll extract what we can
+            logger.info(f"[Batch {batch_num}-{link_num}] Page ready after {self.readiness.times[-1]:.2f} s")
             
             # Random interactions before extraction
             await self.random_mouse_movements(page)
@@ -1106,19 +1289,24 @@ class EnhancedYellowPagesScraper:
             
             # Make sure we have at least a name before saving
             if data and data.get('name'):
-                self.results.append(data)
+                self.add_result(data)
             else:
                 logger.warning(f"Extracted data had no name for {link['url']}")
                 # Still add to results with at least the URL
                 data['name'] = link['title']  # Use the link title as a fallback
-                self.results.append(data)
+                self.add_result(data)
         
         except Exception as e:
             logger.error(f"Failed to scrape {link['url']}: {str(e)}")
+            if self.concurrency:
+                if isinstance(e, PlaywrightTimeoutError):
+                    self.concurrency.overload("timeout")
+                else:
+                    self.concurrency.mark_failed(type(e).__name__)
             await self.debug_page(page, f"failed_{batch_num}_{link_num}")
             
             # Still try to add basic info to results
-            self.results.append({
+            self.add_result({
                 "name": link.get('title', 'Unknown'),
                 "listing_url": link['url'],
                 "scraped_at": datetime.now().isoformat(),
@@ -1126,8 +1314,12 @@ class EnhancedYellowPagesScraper:
                 "scrape_error": str(e)
             })
         finally:
+            if resource_stats:
+                self.resource_policy.add_page(resource_stats)
+                logger.info(f"[Batch {batch_num}-{link_num}] {resource_stats.summary()}")
             await page.close()
 
+    @timed_stage("extract_json_ld")
     async def extract_json_ld(self, page: Page) -> Optional[Dict]:
         """Extract JSON-LD data with enhanced error handling"""
         try:
@@ -1171,6 +1363,7 @@ class EnhancedYellowPagesScraper:
             logger.error(f"JSON-LD extraction error: {str(e)}")
             return None
 
+    @timed_stage("extract_listing_data")
     async def extract_listing_data(self, page: Page, url: str) -> Dict[str, Any]:
         """Extract all available data from listing page"""
         data = {
@@ -1180,9 +1373,6 @@ class EnhancedYellowPagesScraper:
         }
         
         try:
-            # Wait for the page to be fully loaded
-            await page.wait_for_load_state('networkidle', timeout=20000)
-            
             # First try to extract JSON-LD data (more reliable and complete)
             json_ld = await self.extract_json_ld(page)
             if json_ld:
@@ -1787,6 +1977,14 @@ class EnhancedYellowPagesScraper:
         logger.info(f"JSON: {json_path}")
         logger.info(f"CSV: {csv_path}")
 
+    def save_stage_timings(self):
+        """Log the per-stage latency table and write it as JSON next to the results"""
+        self.stages.log_summary(logger)
+        if self.stages.histograms:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = self.stages.dump_json(self.output_dir / f'yellowpages_stage_timings_{timestamp}.json')
+            logger.info(f"Stage timings: {path}")
+
     # Add methods to rotate fingerprints and cookies
     def generate_fingerprint(self):
         """Generate a random but plausible browser fingerprint"""
@@ -1853,6 +2051,17 @@ class EnhancedYellowPagesScraper:
         return False
 
 
+def run_yellowpages_shard(shard_num: int, links: List[Dict[str, str]], settings: Dict[str, Any],
+                          rate_limiter, result_queue) -> Dict[str, Any]:
+    """Worker process entry point for EnhancedYellowPagesScraper.run_sharded"""
+    scraper = EnhancedYellowPagesScraper()
+    for name, value in settings.items():
+        setattr(scraper, name, value)
+    scraper.rate_limiter = rate_limiter
+    scraper.result_queue = result_queue
+    return asyncio.run(scraper.scrape_shard(shard_num, links))
+
+
 async def main():
     """Run the scraper with command line arguments"""
     import argparse
@@ -1862,6 +2071,10 @@ async def main():
     parser.add_argument('--location', type=str, default='los-angeles-ca', help='Location (e.g., los-angeles-ca, new-york-ny)')
     parser.add_argument('--pages', type=int, default=3, help='Number of pages to scrape')
     parser.add_argument('--headless', action='store_true', help='Run in headless mode')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for listing pages, each with its own browser')
+    parser.add_argument('--revisit-after', type=float, default=7.0, metavar='DAYS',
+                        help='Skip listings scraped by an earlier run less than DAYS ago (0 = rescrape, new ones first)')
+    parser.add_argument('--no-frontier', action='store_true', help='Ignore the frontier and scrape every gathered listing')
     
     args = parser.parse_args()
     
@@ -1870,6 +2083,9 @@ async def main():
         location=args.location,
         page_limit=args.pages
     )
+    scraper.shard_workers = args.workers
+    scraper.revisit_after_days = args.revisit_after
+    scraper.use_frontier = not args.no_frontier
     
     await scraper.run()
 
@@ -1,9 +1,19 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import csv
 import time
 import random
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+try:
+    import msgspec
+except ImportError:  # typed decoding is optional; plain json is used without it
+    msgspec = None
+
+from http_client import HttpFetcher, format_timing_summary
 
 # Cookies and headers from your browser session
 cookies = {
@@ -69,28 +79,421 @@ params = {
     'searchQueryState': '{"pagination":{},"isMapVisible":false,"mapBounds":{"west":-74.70774693070216,"east":-73.25205845413966,"south":40.254790439080075,"north":41.13770444804806},"usersSearchTerm":"New York, NY","regionSelection":[{"regionId":6181,"regionType":6}],"filterState":{"sort":{"value":"globalrelevanceex"}},"isListVisible":true,"mapZoom":9}',
 }
 
-def scrape_zillow_listings(location, max_pages=1):
+# Zillow serves at most this many pages of this many results per search
+MAX_SEARCH_PAGES = 20
+RESULTS_PER_PAGE = 41
+PAGINATION_CAP = MAX_SEARCH_PAGES * RESULTS_PER_PAGE
+
+class ZillowSearch:
     """
-    Scrape real estate listings from zillow.com
+    One Zillow search: a location plus its own query-state template
+    
+    The template is copied and frozen (kept serialized) when the search is
+    created, and page parameters are built from a fresh copy of it each time,
+    so nothing is shared between searches or pages. One instance can be used
+    from many threads or tasks at once.
+    """
+    
+    __slots__ = ('_location', '_template')
+    
+    def __init__(self, location, query_state=None, map_bounds=None):
+        """
+        Args:
+            location (str): Location slug (e.g., 'New-York-NY')
+            query_state (dict): searchQueryState template; defaults to the module's ``params``
+            map_bounds (dict): Optional west/east/south/north rectangle replacing the template's
+        """
+        if query_state is None:
+            query_state = json.loads(params['searchQueryState'])
+        else:
+            query_state = json.loads(json.dumps(query_state))
+        if map_bounds:
+            query_state['mapBounds'] = dict(map_bounds)
+        query_state['pagination'] = {}
+        
+        self._location = location
+        self._template = json.dumps(query_state)
+    
+    @property
+    def location(self):
+        return self._location
+    
+    @property
+    def base_url(self):
+        return f"https://www.zillow.com/{self._location}/"
+    
+    @property
+    def query_state(self):
+        """A private copy of the template"""
+        return json.loads(self._template)
+    
+    @property
+    def map_bounds(self):
+        return self.query_state.get('mapBounds')
+    
+    def with_bounds(self, map_bounds):
+        """The same search restricted to another map rectangle"""
+        return ZillowSearch(self._location, self.query_state, map_bounds)
+    
+    def page_params(self, page):
+        """
+        Build request parameters for one search page
+        
+        Args:
+            page (int): Page number
+        
+        Returns:
+            dict: Query parameters for the search request
+        """
+        query_state = json.loads(self._template)
+        query_state['pagination'] = {"currentPage": page}
+        return {'searchQueryState': json.dumps(query_state)}
+    
+    def fetch_page(self, page, fetcher):
+        """
+        Request one page of this search over a pooled client
+        """
+        return fetcher.get(self.base_url, params=self.page_params(page))
+    
+    def __repr__(self):
+        return f"ZillowSearch({self._location!r}, map_bounds={self.map_bounds})"
+
+# Opening tag of the Next.js data script
+NEXT_DATA_TAG = re.compile(rb'<script\b[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>', re.IGNORECASE)
+
+def extract_next_data(body):
+    """
+    Return the raw __NEXT_DATA__ JSON of a search page, or None if missing
+    
+    The payload is sliced straight out of the response bytes; BeautifulSoup
+    is only used if the tag is not found that way.
     
     Args:
-        location (str): Location to search for (e.g., 'New-York-NY')
+        body (bytes | str): Page HTML
+    """
+    raw = body.encode('utf-8') if isinstance(body, str) else body
+    tag = NEXT_DATA_TAG.search(raw)
+    if tag:
+        end = raw.find(b'</script>', tag.end())
+        if end != -1:
+            return raw[tag.end():end]
+    
+    soup = BeautifulSoup(raw, 'html.parser')
+    next_data_script = soup.find('script', {'id': '__NEXT_DATA__'})
+    return next_data_script.string if next_data_script else None
+
+def total_result_count(data):
+    """
+    Number of homes the search reports in total (across all pages), or None if not reported
+    """
+    cat1 = data['props']['pageProps']['searchPageState']['cat1']
+    search_list = cat1.get('searchList')
+    return search_list.get('totalResultCount') if isinstance(search_list, dict) else None
+
+def home_to_record(home):
+    """
+    Flatten one listResults entry into our output schema
+    
+    Args:
+        home (dict): Home from searchResults.listResults
+    
+    Returns:
+        dict: Property dictionary
+    """
+    # Extract home info data
+    home_info = home.get('hdpData', {}).get('homeInfo', {})
+    
+    home_data = {
+        # Basic info
+        "zpid": home.get('zpid', None),
+        "home_type": home_info.get('homeType', None),
+        "posted": str(home_info.get('daysOnZillow', None)) + ' days ago',
+        "time_on_zillow": home_info.get('timeOnZillow', None),
+        "home_URL": home.get('detailUrl', None),
+        "home_main_image": home.get('imgSrc', None),
+        "home_status": home.get('statusType', None),
+        "home_status_detailed": home.get('sgapt', None),
+        "raw_home_status": home.get('rawHomeStatusCd', None),
+        "marketing_status": home.get('marketingStatusSimplifiedCd', None),
+
+        # Pricing & Value info
+        "home_price": home.get('price', None),
+        "unformatted_price": home.get('unformattedPrice', None),
+        "country_currency": home.get('countryCurrency', None),
+        "zestimate": home.get('zestimate', None),
+        "rent_zestimate": home_info.get('rentZestimate', None),
+        "tax_assessed_value": home_info.get('taxAssessedValue', None),
+
+        # Location info
+        "home_address": home.get('address', None),
+        "address_street": home.get('addressStreet', None),
+        "address_city": home.get('addressCity', None),
+        "address_state": home.get('addressState', None),
+        "address_zipcode": home.get('addressZipcode', None),
+        "unit": home_info.get('unit', None),
+        "latitude": home.get('latLong', {}).get('latitude', None),
+        "longitude": home.get('latLong', {}).get('longitude', None),
+
+        # Property details
+        "num_beds": home.get('beds', None),
+        "num_baths": home.get('baths', None),
+        "home_area": home.get('area', None),
+        "living_area": home_info.get('livingArea', None),
+        "flex_field_text": home.get('flexFieldText', None),
+
+        # Additional features
+        "broker_name": home.get('brokerName', None),
+        "has_3d_model": home.get('has3DModel', False),
+        "has_video": home.get('hasVideo', False),
+        "is_featured": home.get('isFeaturedListing', False),
+        "is_showcase_listing": home.get('isShowcaseListing', False),
+        "is_zillow_owned": home.get('isZillowOwned', False),
+        "is_undisclosed_address": home.get('isUndisclosedAddress', False),
+        "is_user_claiming_owner": home.get('isUserClaimingOwner', False),
+        "is_user_confirmed_claim": home.get('isUserConfirmedClaim', False),
+        "should_highlight": home_info.get('shouldHighlight', False),
+        "is_featured_home_builder": home_info.get('isPremierBuilder', False),
+        "is_non_owner_occupied": home_info.get('isNonOwnerOccupied', None),
+        "listing_sub_type_is_FSBA": home_info.get('listing_sub_type', {}).get('is_FSBA', None)
+    }
+
+    # Add all photo URLs if available
+    if 'carouselPhotos' in home and home['carouselPhotos']:
+        photo_urls = [photo.get('url') for photo in home['carouselPhotos']]
+        home_data["all_photos"] = photo_urls
+        home_data["photo_count"] = len(photo_urls)
+    
+    return home_data
+
+if msgspec is not None:
+    # Typed view of __NEXT_DATA__ holding only what home_to_record() reads.
+    # Every other key in the document is skipped by the decoder without being
+    # materialized. Scalars stay loosely typed (Any) because Zillow mixes
+    # strings and numbers for the same field across listings.
+    
+    class LatLong(msgspec.Struct):
+        latitude: Any = None
+        longitude: Any = None
+    
+    class ListingSubType(msgspec.Struct):
+        is_FSBA: Any = None
+    
+    class HomeInfo(msgspec.Struct):
+        homeType: Any = None
+        daysOnZillow: Any = None
+        timeOnZillow: Any = None
+        rentZestimate: Any = None
+        taxAssessedValue: Any = None
+        unit: Any = None
+        livingArea: Any = None
+        shouldHighlight: Any = False
+        isPremierBuilder: Any = False
+        isNonOwnerOccupied: Any = None
+        listing_sub_type: Optional[ListingSubType] = None
+    
+    class HdpData(msgspec.Struct):
+        homeInfo: Optional[HomeInfo] = None
+    
+    class CarouselPhoto(msgspec.Struct):
+        url: Any = None
+    
+    class ListResult(msgspec.Struct):
+        zpid: Any = None
+        detailUrl: Any = None
+        imgSrc: Any = None
+        statusType: Any = None
+        sgapt: Any = None
+        rawHomeStatusCd: Any = None
+        marketingStatusSimplifiedCd: Any = None
+        price: Any = None
+        unformattedPrice: Any = None
+        countryCurrency: Any = None
+        zestimate: Any = None
+        address: Any = None
+        addressStreet: Any = None
+        addressCity: Any = None
+        addressState: Any = None
+        addressZipcode: Any = None
+        latLong: Optional[LatLong] = None
+        beds: Any = None
+        baths: Any = None
+        area: Any = None
+        flexFieldText: Any = None
+        brokerName: Any = None
+        has3DModel: Any = False
+        hasVideo: Any = False
+        isFeaturedListing: Any = False
+        isShowcaseListing: Any = False
+        isZillowOwned: Any = False
+        isUndisclosedAddress: Any = False
+        isUserClaimingOwner: Any = False
+        isUserConfirmedClaim: Any = False
+        carouselPhotos: Optional[List[CarouselPhoto]] = None
+        hdpData: Optional[HdpData] = None
+    
+    class SearchResults(msgspec.Struct):
+        listResults: List[ListResult]
+    
+    class Cat1(msgspec.Struct):
+        searchResults: SearchResults
+    
+    class SearchPageState(msgspec.Struct):
+        cat1: Cat1
+    
+    class PageProps(msgspec.Struct):
+        searchPageState: SearchPageState
+    
+    class Props(msgspec.Struct):
+        pageProps: PageProps
+    
+    class NextData(msgspec.Struct):
+        props: Props
+    
+    NEXT_DATA_DECODER = msgspec.json.Decoder(NextData)
+
+_EMPTY_HOME_INFO = HomeInfo() if msgspec is not None else None
+_EMPTY_LAT_LONG = LatLong() if msgspec is not None else None
+
+def list_result_to_record(home):
+    """
+    Same as home_to_record(), for a typed ListResult
+    
+    Args:
+        home (ListResult): Home decoded by NEXT_DATA_DECODER
+    
+    Returns:
+        dict: Property dictionary
+    """
+    home_info = home.hdpData.homeInfo if home.hdpData and home.hdpData.homeInfo else _EMPTY_HOME_INFO
+    lat_long = home.latLong or _EMPTY_LAT_LONG
+    sub_type = home_info.listing_sub_type
+    
+    home_data = {
+        # Basic info
+        "zpid": home.zpid,
+        "home_type": home_info.homeType,
+        "posted": str(home_info.daysOnZillow) + ' days ago',
+        "time_on_zillow": home_info.timeOnZillow,
+        "home_URL": home.detailUrl,
+        "home_main_image": home.imgSrc,
+        "home_status": home.statusType,
+        "home_status_detailed": home.sgapt,
+        "raw_home_status": home.rawHomeStatusCd,
+        "marketing_status": home.marketingStatusSimplifiedCd,
+        
+        # Pricing & Value info
+        "home_price": home.price,
+        "unformatted_price": home.unformattedPrice,
+        "country_currency": home.countryCurrency,
+        "zestimate": home.zestimate,
+        "rent_zestimate": home_info.rentZestimate,
+        "tax_assessed_value": home_info.taxAssessedValue,
+        
+        # Location info
+        "home_address": home.address,
+        "address_street": home.addressStreet,
+        "address_city": home.addressCity,
+        "address_state": home.addressState,
+        "address_zipcode": home.addressZipcode,
+        "unit": home_info.unit,
+        "latitude": lat_long.latitude,
+        "longitude": lat_long.longitude,
+        
+        # Property details
+        "num_beds": home.beds,
+        "num_baths": home.baths,
+        "home_area": home.area,
+        "living_area": home_info.livingArea,
+        "flex_field_text": home.flexFieldText,
+        
+        # Additional features
+        "broker_name": home.brokerName,
+        "has_3d_model": home.has3DModel,
+        "has_video": home.hasVideo,
+        "is_featured": home.isFeaturedListing,
+        "is_showcase_listing": home.isShowcaseListing,
+        "is_zillow_owned": home.isZillowOwned,
+        "is_undisclosed_address": home.isUndisclosedAddress,
+        "is_user_claiming_owner": home.isUserClaimingOwner,
+        "is_user_confirmed_claim": home.isUserConfirmedClaim,
+        "should_highlight": home_info.shouldHighlight,
+        "is_featured_home_builder": home_info.isPremierBuilder,
+        "is_non_owner_occupied": home_info.isNonOwnerOccupied,
+        "listing_sub_type_is_FSBA": sub_type.is_FSBA if sub_type else None
+    }
+    
+    # Add all photo URLs if available
+    if home.carouselPhotos:
+        photo_urls = [photo.url for photo in home.carouselPhotos]
+        home_data["all_photos"] = photo_urls
+        home_data["photo_count"] = len(photo_urls)
+    
+    return home_data
+
+def parse_list_results(body, typed=True):
+    """
+    Decode a search page's listResults into property dictionaries
+    
+    With msgspec installed (and ``typed`` set) only the list results are
+    decoded, into compact typed structs; otherwise the whole __NEXT_DATA__
+    document goes through json.loads and home_to_record(). Both paths
+    produce the same records.
+    
+    Args:
+        body (bytes | str): Page HTML
+        typed (bool): Use the msgspec decoder when available
+    
+    Returns:
+        list: Property dictionaries, or None if the page has no __NEXT_DATA__
+    
+    Raises:
+        json.JSONDecodeError, KeyError: If the data is malformed
+    """
+    next_data = extract_next_data(body)
+    if not next_data:
+        return None
+    
+    if typed and msgspec is not None:
+        try:
+            page = NEXT_DATA_DECODER.decode(next_data)
+            homes = page.props.pageProps.searchPageState.cat1.searchResults.listResults
+            return [list_result_to_record(home) for home in homes]
+        except (msgspec.ValidationError, msgspec.DecodeError) as e:
+            print(f"Typed decoding failed ({e}), falling back to json")
+    
+    data = json.loads(next_data)
+    homes = data['props']['pageProps']['searchPageState']['cat1']['searchResults']['listResults']
+    return [home_to_record(home) for home in homes]
+
+def scrape_zillow_search(search, max_pages=1, fetcher=None, save_html=True, first_page=None):
+    """
+    Scrape the pages of one ZillowSearch
+    
+    Args:
+        search (ZillowSearch): Search to page through
         max_pages (int): Maximum number of pages to scrape
+        fetcher (HttpFetcher): Pooled client to reuse; one is created (and
+            closed) for this call if omitted
+        save_html (bool): Save each page's HTML for debugging
+        first_page (list): Records of page 1 if it was already fetched (e.g.
+            while counting tiles); page 1 is then not requested again
     
     Returns:
         list: List of property dictionaries
     """
     all_properties = []
-    base_url = f"https://www.zillow.com/{location}/"
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = HttpFetcher(headers=headers, cookies=cookies)
     
     for page in range(1, max_pages + 1):
-        # Update pagination in params
-        params['searchQueryState'] = json.loads(params['searchQueryState'])
-        params['searchQueryState']['pagination'] = {"currentPage": page}
-        params['searchQueryState'] = json.dumps(params['searchQueryState'])
+        if page == 1 and first_page is not None:
+            all_properties.extend(first_page)
+            print(f"Reusing {len(first_page)} properties from page 1 for {search.location}")
+            continue
         
         try:
-            print(f"Scraping page {page} for {location}...")
+            print(f"Scraping page {page} for {search.location}...")
             
             # Add a random delay between requests to avoid rate limiting
             if page > 1:
@@ -99,104 +502,242 @@ def scrape_zillow_listings(location, max_pages=1):
                 time.sleep(delay)
             
             # Make the request
-            response = requests.get(base_url, params=params, cookies=cookies, headers=headers)
+            response = search.fetch_page(page, fetcher)
             
             # Check if request was successful
             if response.status_code != 200:
                 print(f"Failed to retrieve page {page}. Status code: {response.status_code}")
                 break
-                
-            # Parse the HTML content
-            soup = BeautifulSoup(response.text, 'html.parser')
             
             # Try to find the property data in the NEXT_DATA script
-            next_data_script = soup.find('script', {'id': '__NEXT_DATA__'})
-            
-            if next_data_script:
-                try:
-                    data = json.loads(next_data_script.string)
-                    homes = data['props']['pageProps']['searchPageState']['cat1']['searchResults']['listResults']
-                    
-                    for home in homes:
-                        # Extract home info data
-                        home_info = home.get('hdpData', {}).get('homeInfo', {})
-                        
-                        home_data = {
-                            # Basic info
-                            "zpid": home.get('zpid', None),
-                            "home_type": home_info.get('homeType', None),
-                            "posted": str(home_info.get('daysOnZillow', None)) + ' days ago',
-                            "time_on_zillow": home_info.get('timeOnZillow', None),
-                            "home_URL": home.get('detailUrl', None),
-                            "home_main_image": home.get('imgSrc', None),
-                            "home_status": home.get('statusType', None),
-                            "home_status_detailed": home.get('sgapt', None),
-                            "raw_home_status": home.get('rawHomeStatusCd', None),
-                            "marketing_status": home.get('marketingStatusSimplifiedCd', None),
-                            
-                            # Pricing & Value info
-                            "home_price": home.get('price', None),
-                            "unformatted_price": home.get('unformattedPrice', None),
-                            "country_currency": home.get('countryCurrency', None),
-                            "zestimate": home.get('zestimate', None),
-                            "rent_zestimate": home_info.get('rentZestimate', None),
-                            "tax_assessed_value": home_info.get('taxAssessedValue', None),
-                            
-                            # Location info
-                            "home_address": home.get('address', None),
-                            "address_street": home.get('addressStreet', None),
-                            "address_city": home.get('addressCity', None),
-                            "address_state": home.get('addressState', None),
-                            "address_zipcode": home.get('addressZipcode', None),
-                            "unit": home_info.get('unit', None),
-                            "latitude": home.get('latLong', {}).get('latitude', None),
-                            "longitude": home.get('latLong', {}).get('longitude', None),
-                            
-                            # Property details
-                            "num_beds": home.get('beds', None),
-                            "num_baths": home.get('baths', None),
-                            "home_area": home.get('area', None),
-                            "living_area": home_info.get('livingArea', None),
-                            "flex_field_text": home.get('flexFieldText', None),
-                            
-                            # Additional features
-                            "broker_name": home.get('brokerName', None),
-                            "has_3d_model": home.get('has3DModel', False),
-                            "has_video": home.get('hasVideo', False),
-                            "is_featured": home.get('isFeaturedListing', False),
-                            "is_showcase_listing": home.get('isShowcaseListing', False),
-                            "is_zillow_owned": home.get('isZillowOwned', False),
-                            "is_undisclosed_address": home.get('isUndisclosedAddress', False),
-                            "is_user_claiming_owner": home.get('isUserClaimingOwner', False),
-                            "is_user_confirmed_claim": home.get('isUserConfirmedClaim', False),
-                            "should_highlight": home_info.get('shouldHighlight', False),
-                            "is_featured_home_builder": home_info.get('isPremierBuilder', False),
-                            "is_non_owner_occupied": home_info.get('isNonOwnerOccupied', None),
-                            "listing_sub_type_is_FSBA": home_info.get('listing_sub_type', {}).get('is_FSBA', None)
-                        }
-                        
-                        # Add all photo URLs if available
-                        if 'carouselPhotos' in home and home['carouselPhotos']:
-                            photo_urls = [photo.get('url') for photo in home['carouselPhotos']]
-                            home_data["all_photos"] = photo_urls
-                            home_data["photo_count"] = len(photo_urls)
-                        
-                        all_properties.append(home_data)
-                    
+            try:
+                homes = parse_list_results(response.content)
+                
+                if homes is not None:
+                    all_properties.extend(homes)
                     print(f"Found {len(homes)} properties on page {page}")
+                else:
+                    print("Could not find NEXT_DATA script in page")
                     
-                except (json.JSONDecodeError, KeyError) as e:
-                    print(f"Error parsing JSON data: {e}")
-            else:
-                print("Could not find NEXT_DATA script in page")
-                
+            except (json.JSONDecodeError, KeyError) as e:
+                print(f"Error parsing JSON data: {e}")
+            
             # Save the HTML (for debugging)
-            with open(f"zillow_{location}_page_{page}.html", "w", encoding="utf-8") as f:
-                f.write(response.text)
+            if save_html:
+                with open(f"zillow_{search.location}_page_{page}.html", "w", encoding="utf-8") as f:
+                    f.write(response.text)
                 
         except Exception as e:
             print(f"Error scraping page {page}: {e}")
     
+    if own_fetcher:
+        if fetcher.timings:
+            print(format_timing_summary(fetcher.timings))
+        fetcher.close()
+    
+    return all_properties
+
+def scrape_zillow_listings(location, max_pages=1, fetcher=None, map_bounds=None, save_html=True):
+    """
+    Scrape real estate listings from zillow.com
+    
+    Args:
+        location (str): Location to search for (e.g., 'New-York-NY')
+        max_pages (int): Maximum number of pages to scrape
+        fetcher (HttpFetcher): Pooled client to reuse; one is created (and
+            closed) for this call if omitted
+        map_bounds (dict): Optional rectangle to search instead of the template's
+        save_html (bool): Save each page's HTML for debugging
+    
+    Returns:
+        list: List of property dictionaries
+    """
+    search = ZillowSearch(location, map_bounds=map_bounds)
+    return scrape_zillow_search(search, max_pages, fetcher=fetcher, save_html=save_html)
+
+def scrape_zillow_searches(searches, max_pages=1, workers=4, fetcher=None):
+    """
+    Run several searches (regions) at once on a thread pool
+    
+    Args:
+        searches (list): ZillowSearch objects
+        max_pages (int): Maximum number of pages per search
+        workers (int): Searches run at the same time
+        fetcher (HttpFetcher): Pooled client to reuse; one is created (and
+            closed) for this call if omitted
+    
+    Returns:
+        list: One list of property dictionaries per search, in input order
+    """
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = HttpFetcher(headers=headers, cookies=cookies, pool_size=workers)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                lambda search: scrape_zillow_search(search, max_pages, fetcher=fetcher, save_html=False),
+                searches
+            ))
+    finally:
+        if own_fetcher:
+            if fetcher.timings:
+                print(format_timing_summary(fetcher.timings))
+            fetcher.close()
+
+def split_bounds(bounds):
+    """
+    Split a map rectangle into four equal quadrants
+    
+    Args:
+        bounds (dict): Rectangle with west/east/south/north keys
+    
+    Returns:
+        list: Four sub-rectangles
+    """
+    mid_lng = (bounds['west'] + bounds['east']) / 2
+    mid_lat = (bounds['south'] + bounds['north']) / 2
+    return [
+        {'west': bounds['west'], 'east': mid_lng, 'south': mid_lat, 'north': bounds['north']},
+        {'west': mid_lng, 'east': bounds['east'], 'south': mid_lat, 'north': bounds['north']},
+        {'west': bounds['west'], 'east': mid_lng, 'south': bounds['south'], 'north': mid_lat},
+        {'west': mid_lng, 'east': bounds['east'], 'south': bounds['south'], 'north': mid_lat},
+    ]
+
+def count_tile_results(search, fetcher):
+    """
+    Ask Zillow how many homes a search's map rectangle holds (fetches its first page)
+    
+    Returns:
+        tuple: (totalResultCount, page HTML) for the tile; the count is None
+            if the page has no count, and both are None if it could not be
+            fetched or read
+    """
+    try:
+        response = search.fetch_page(1, fetcher)
+    except Exception as e:
+        print(f"Error counting tile {search.map_bounds}: {e}")
+        return None, None
+    if response.status_code != 200:
+        print(f"Failed to count tile {search.map_bounds}. Status code: {response.status_code}")
+        return None, None
+    
+    next_data = extract_next_data(response.content)
+    if not next_data:
+        return None, None
+    
+    try:
+        return total_result_count(json.loads(next_data)), response.content
+    except (json.JSONDecodeError, KeyError) as e:
+        print(f"Error reading result count: {e}")
+        return None, None
+
+def first_page_results(body):
+    """
+    Records of a counted tile's first page, or None to fetch it again while crawling
+    """
+    try:
+        return parse_list_results(body)
+    except (json.JSONDecodeError, KeyError) as e:
+        print(f"Error parsing first page of tile: {e}")
+        return None
+
+def plan_tiles(search, fetcher, cap=PAGINATION_CAP, max_depth=5, workers=4):
+    """
+    Split a search rectangle into leaf tiles that each fit under the pagination cap
+    
+    A tile reporting more than ``cap`` results is split into quadrants, level
+    by level, until every tile fits or ``max_depth`` is reached. Each level's
+    tiles are counted in parallel. A leaf's first page, fetched while
+    counting it, is kept so the crawl does not request it again.
+    
+    Args:
+        search (ZillowSearch): Search whose map rectangle should be covered
+        fetcher (HttpFetcher): Shared pooled client
+        cap (int): Most results one search can page through
+        max_depth (int): Maximum number of splits
+        workers (int): Parallel count requests
+    
+    Returns:
+        list: (ZillowSearch, result_count, first_page) for every non-empty
+            leaf tile; first_page is None if it has to be fetched again
+    """
+    leaves = []
+    level = [search]
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for depth in range(max_depth + 1):
+            counts = list(executor.map(lambda tile: count_tile_results(tile, fetcher), level))
+            next_level = []
+            
+            for tile, (count, body) in zip(level, counts):
+                if count is None:
+                    # Could not count it - crawl it as-is rather than lose it
+                    leaves.append((tile, PAGINATION_CAP, first_page_results(body) if body else None))
+                elif count > cap and depth < max_depth:
+                    next_level.extend(tile.with_bounds(bounds) for bounds in split_bounds(tile.map_bounds))
+                elif count > 0:
+                    if count > cap:
+                        print(f"Tile {tile.map_bounds} still has {count} results at max depth; crawling the first {cap}")
+                    leaves.append((tile, count, first_page_results(body)))
+            
+            print(f"Tiling depth {depth}: {len(level)} tiles counted, {len(next_level)} to split further")
+            if not next_level:
+                break
+            level = next_level
+    
+    return leaves
+
+def scrape_zillow_tiled(location, bounds=None, cap=PAGINATION_CAP, max_depth=5, workers=4, fetcher=None):
+    """
+    Scrape every home in a map rectangle by crawling adaptive quadtree tiles in parallel
+    
+    Args:
+        location (str): Location to search for (e.g., 'New-York-NY')
+        bounds (dict): Rectangle to cover; defaults to the template's mapBounds
+        cap (int): Most results one search can page through
+        max_depth (int): Maximum number of quadtree splits
+        workers (int): Tiles crawled at the same time
+        fetcher (HttpFetcher): Pooled client to reuse; one is created (and
+            closed) for this call if omitted
+    
+    Returns:
+        list: Property dictionaries, deduplicated by zpid
+    """
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = HttpFetcher(headers=headers, cookies=cookies, pool_size=workers)
+    search = ZillowSearch(location, map_bounds=bounds)
+    
+    try:
+        leaves = plan_tiles(search, fetcher, cap=cap, max_depth=max_depth, workers=workers)
+        print(f"Crawling {len(leaves)} tiles covering {sum(count for _, count, _ in leaves)} results")
+        
+        def crawl(leaf):
+            tile, count, first_page = leaf
+            pages = min(MAX_SEARCH_PAGES, max(1, math.ceil(count / RESULTS_PER_PAGE)))
+            return scrape_zillow_search(tile, pages, fetcher=fetcher, save_html=False, first_page=first_page)
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            tile_results = list(executor.map(crawl, leaves))
+    finally:
+        if fetcher.timings:
+            print(format_timing_summary(fetcher.timings))
+        if own_fetcher:
+            fetcher.close()
+    
+    # Tiles share edges, so a home on a boundary can show up twice
+    all_properties = []
+    seen_zpids = set()
+    for properties in tile_results:
+        for home_data in properties:
+            zpid = home_data.get('zpid')
+            if zpid is not None:
+                if zpid in seen_zpids:
+                    continue
+                seen_zpids.add(zpid)
+            all_properties.append(home_data)
+    
     return all_properties
 
 def save_to_csv(properties, filename):
@@ -247,8 +788,14 @@ def main():
     # Number of pages to scrape
     max_pages = 20
     
+    # Split the map into tiles so results beyond the pagination cap are reachable
+    tiled = False
+    
     # Scrape the properties
-    properties = scrape_zillow_listings(location, max_pages)
+    if tiled:
+        properties = scrape_zillow_tiled(location, workers=4)
+    else:
+        properties = scrape_zillow_listings(location, max_pages)
     
     # Save to JSON
     save_to_json(properties, f"zillow_{location}_listings.json")